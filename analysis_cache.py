@@ -0,0 +1,191 @@
+import os
+import json
+import pickle
+import zlib
+import hashlib
+import argparse
+
+# Bump this whenever the layout or meaning of a cached section changes, so stale
+# entries from older versions of the analyses are never reused
+CACHE_VERSION = 3
+MAGIC = b"RACH"
+
+class CacheEntry:
+    """
+    Cached analyses of one function. Each analysis is its own section in the file,
+    and a section is only read and decompressed the first time it is asked for.
+    """
+    def __init__(self, path: str, exists: bool):
+        self.path = path
+        self.exists = exists
+        self.index = None # Section name -> (offset, length), read on first access
+        self.data_start = 0 # Offsets in the index are relative to the end of the header
+        self.loaded = dict()
+        self.dirty = False
+
+    def read_index(self):
+        if self.index is not None:
+            return self.index
+        self.index = dict()
+        if not self.exists:
+            return self.index
+        try:
+            with open(self.path, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return self.index
+                length = int.from_bytes(f.read(4), 'little')
+                self.index = pickle.loads(f.read(length))
+                self.data_start = len(MAGIC) + 4 + length
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.index = dict()
+        return self.index
+
+    def get(self, section: str):
+        if section in self.loaded:
+            return self.loaded[section]
+        index = self.read_index()
+        if section not in index:
+            return None
+        offset, length = index[section]
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self.data_start + offset)
+                data = pickle.loads(zlib.decompress(f.read(length)))
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            return None
+        self.loaded[section] = data
+        return data
+
+    def put(self, section: str, data):
+        self.loaded[section] = data
+        self.dirty = True
+
+    def reset(self):
+        # Drop whatever is on disk, e.g. when it no longer matches the function
+        self.index = dict()
+        self.loaded = dict()
+        self.exists = False
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        # Pull in any sections from the existing file that were never loaded
+        for section in self.read_index():
+            self.get(section)
+        blobs = dict()
+        for section, data in self.loaded.items():
+            blobs[section] = zlib.compress(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        index = dict()
+        offset = 0
+        for section, blob in blobs.items():
+            index[section] = (offset, len(blob))
+            offset += len(blob)
+        header = pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path = self.path + f".{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(4, 'little'))
+            f.write(header)
+            for blob in blobs.values():
+                f.write(blob)
+        os.replace(tmp_path, self.path)
+        self.index = index
+        self.data_start = len(MAGIC) + 4 + len(header)
+        self.exists = True
+        self.dirty = False
+
+class AnalysisCache:
+    """
+    Content-addressed on-disk cache of per-function analyses (CFG topology,
+    dominator tree, liveness and interference graph), keyed by a hash of the
+    function's instructions and arguments. The directory is kept under max_bytes
+    by evicting the least recently used entries.
+    """
+    def __init__(self, directory = ".analysis-cache", max_bytes = 64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, func: dict):
+        # The name doesn't affect any analysis, so identical bodies share an entry
+        canonical = json.dumps({'version': CACHE_VERSION, 'args': func.get('args', []), 'instrs': func['instrs']},
+                               sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def lookup(self, func: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, self.key(func) + ".bin")
+        exists = os.path.exists(path)
+        if exists:
+            self.hits += 1
+            # Touch the entry so eviction sees it as recently used
+            os.utime(path)
+        else:
+            self.misses += 1
+        return CacheEntry(path, exists)
+
+    def save(self, entry: CacheEntry):
+        if entry.dirty:
+            entry.save()
+            self.evict()
+
+    def evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".bin"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".bin") or name.endswith(".tmp"):
+                os.remove(os.path.join(self.directory, name))
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def __str__(self):
+        return f"Analysis cache: {self.hits} hits, {self.misses} misses"
+
+def add_arguments(parser: argparse.ArgumentParser):
+    # Cache options shared by cfg.py and batch.py
+    parser.add_argument("--cache", action=argparse.BooleanOptionalAction, default=False,
+                        help="reuse CFG analyses of unchanged functions from earlier runs")
+    parser.add_argument("--cache-dir", default=".analysis-cache", help="where cached analyses are kept")
+    parser.add_argument("--cache-size", type=int, default=64, help="size limit of the cache directory in MB")
+    parser.add_argument("--clear-cache", action="store_true", help="delete all cached analyses before running")
+
+def from_arguments(args):
+    """
+    Sets up the cache the command line asked for
+
+    Args:
+        args: Parsed arguments from a parser given add_arguments
+
+    Returns:
+        An AnalysisCache, or None when caching is off
+    """
+    cache = AnalysisCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    if args.clear_cache:
+        cache.clear()
+    return cache if args.cache else None
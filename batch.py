@@ -0,0 +1,140 @@
+import os
+import sys
+import glob
+import json
+import time
+import io
+import contextlib
+import argparse
+import concurrent.futures
+import relabel
+import bril_parser
+import cfg
+import analysis_cache
+import instrument
+
+def find_bril_files(paths):
+    """
+    Expands directories and glob patterns into the Bril files to compile
+
+    Args:
+        paths: Directories, files or glob patterns
+
+    Returns:
+        Sorted list of Bril files, skipping the -relabeled.bril files left by older runs
+    """
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            files.update(glob.glob(os.path.join(path, "*.bril")))
+        else:
+            files.update(glob.glob(path))
+    return sorted(f for f in files if not f.endswith("-relabeled.bril"))
+
+def compile_file(path: str, cache = None, profile = None):
+    """
+    Relabels, parses and allocates one Bril file without writing intermediate files
+
+    Args:
+        path: Path to the Bril file
+        cache: Optional AnalysisCache to reuse CFG analyses from
+        profile: instrument.options() of the parent when profiling from a worker
+            process; the worker's profile is then returned in record['profile']
+
+    Returns:
+        (record, output) where record holds the per-allocator results and output is
+        the text report cfg.py would have printed for this file
+    """
+    start_time = time.perf_counter()
+    record = {'file': path, 'ok': False, 'functions': []}
+    output = io.StringIO()
+    if cache is not None:
+        hits, misses = cache.hits, cache.misses
+    if profile is not None:
+        instrument.enable(**profile)
+    try:
+        with open(path, 'r') as f:
+            # Relabeling, parsing and allocation are chained lazily, so only the
+            # function being allocated is held in memory
+            program = {'functions': bril_parser.iter_functions(relabel.relabel_stream(f))}
+            # The .s files are named after the source file, as test-all.sh did
+            with contextlib.redirect_stdout(output):
+                record['ok'] = cfg.allocate_program(program, os.path.splitext(path)[0], 1, record['functions'], cache)
+    except Exception as e:
+        output.write(f"Error: {e}\n")
+        record['error'] = str(e)
+    record['time'] = time.perf_counter() - start_time
+    if cache is not None:
+        record['cache'] = {'hits': cache.hits - hits, 'misses': cache.misses - misses}
+    if profile is not None:
+        record['profile'] = instrument.disable().report()
+    return record, output.getvalue()
+
+def compile_files(files: list, workers = 1, cache = None):
+    # Yields (record, output) for each file in order, compiling in a worker pool if asked
+    if workers <= 1:
+        for path in files:
+            yield compile_file(path, cache)
+        return
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        profiles = [instrument.options()] * len(files)
+        for result in executor.map(compile_file, files, [cache] * len(files), profiles):
+            yield result
+
+def main():
+    parser = argparse.ArgumentParser(description="Relabel, parse and allocate registers for a batch of Bril files in one process")
+    parser.add_argument("paths", nargs="*", help="directories, files or glob patterns of .bril files")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("-o", "--output", default="batch-results.json", help="where to write the structured results")
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't print the per-function reports")
+    analysis_cache.add_arguments(parser)
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    cache = analysis_cache.from_arguments(args)
+    profiler = instrument.from_arguments(args)
+    if len(args.paths) == 0:
+        if not args.clear_cache:
+            parser.error("at least one path is required unless --clear-cache is given")
+        return
+
+    files = find_bril_files(args.paths)
+    if len(files) == 0:
+        print("Error: no .bril files found")
+        sys.exit(1)
+
+    start_time = time.perf_counter()
+    records = []
+    ok = True
+    for record, output in compile_files(files, args.workers, cache):
+        records.append(record)
+        if 'profile' in record:
+            profiler.merge(record.pop('profile'))
+        name = os.path.splitext(os.path.basename(record['file']))[0]
+        if not args.quiet:
+            sys.stdout.write(output)
+        if not record['ok']:
+            print(f"Error: CFG analysis failed for {name}")
+            ok = False
+            break
+        print(f"Successfully processed {name}")
+
+    summary = {'time': time.perf_counter() - start_time, 'files': records}
+    if cache is not None:
+        # Worker processes each count into their own copy of the cache, so the
+        # totals are summed from the per-file counts
+        if args.workers > 1:
+            cache.hits = sum(r['cache']['hits'] for r in records)
+            cache.misses = sum(r['cache']['misses'] for r in records)
+        summary['cache'] = cache.stats()
+        print(cache)
+    if profiler is not None:
+        instrument.disable()
+        summary['profile'] = profiler.report()
+        print(profiler)
+    with open(args.output, 'w') as f:
+        json.dump(summary, f, indent=2)
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import time
+import argparse
+import blocks
+import cfg
+
+def nested_loops(depth: int, width = 1):
+    """
+    Builds a Bril function of nested counting loops, the worst case for dominance
+    frontiers since every block in a loop has all the enclosing headers in its frontier
+
+    Args:
+        depth: Number of nested loops
+        width: Number of straight-line blocks in the body of each loop
+
+    Returns:
+        The function as the JSON structure bril2json produces
+    """
+    instrs = [{'dest': 'n', 'type': 'int', 'op': 'const', 'value': 2},
+              {'dest': 'one', 'type': 'int', 'op': 'const', 'value': 1},
+              {'dest': 'sum', 'type': 'int', 'op': 'const', 'value': 0},
+              {'dest': 'i0', 'type': 'int', 'op': 'const', 'value': 0}]
+    for k in range(depth):
+        instrs.append({'label': f'h{k}'})
+        instrs.append({'dest': 'c', 'type': 'bool', 'op': 'lt', 'args': [f'i{k}', 'n']})
+        instrs.append({'op': 'br', 'args': ['c'], 'labels': [f'b{k}_0', f'x{k}']})
+        for w in range(width):
+            instrs.append({'label': f'b{k}_{w}'})
+            instrs.append({'dest': 'sum', 'type': 'int', 'op': 'add', 'args': ['sum', f'i{k}']})
+        if k + 1 < depth:
+            # Falls through into the next loop's header
+            instrs.append({'dest': f'i{k + 1}', 'type': 'int', 'op': 'const', 'value': 0})
+        else:
+            instrs.append({'dest': f'i{k}', 'type': 'int', 'op': 'add', 'args': [f'i{k}', 'one']})
+            instrs.append({'op': 'jmp', 'labels': [f'h{k}']})
+    # Each loop's exit increments the enclosing loop's counter and jumps back to its header
+    for k in reversed(range(depth)):
+        instrs.append({'label': f'x{k}'})
+        if k > 0:
+            instrs.append({'dest': f'i{k - 1}', 'type': 'int', 'op': 'add', 'args': [f'i{k - 1}', 'one']})
+            instrs.append({'op': 'jmp', 'labels': [f'h{k - 1}']})
+    instrs.append({'op': 'print', 'args': ['sum']})
+    return {'name': 'main', 'instrs': instrs}
+
+def build_cfg(func: dict):
+    fn_blocks = blocks.form_blocks(func)
+    for block in fn_blocks.values():
+        block.reinitialize_vars()
+    return cfg.CFG(fn_blocks)
+
+def benchmark(depths: list, width = 1, repeat = 3):
+    print(f"{'depth':>6}{'blocks':>8}{'frontier':>10}{'frontiers (s)':>15}{'phis (s)':>12}")
+    for depth in depths:
+        graph = build_cfg(nested_loops(depth, width))
+        # Best of repeat, so the numbers aren't skewed by one slow run
+        frontier_time = None
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            graph.compute_dominance_frontiers()
+            elapsed = time.perf_counter() - start_time
+            frontier_time = elapsed if frontier_time is None else min(frontier_time, elapsed)
+        start_time = time.perf_counter()
+        graph.place_phis("minimal")
+        phi_time = time.perf_counter() - start_time
+        size = sum(len(frontier) for frontier in graph.dominance_frontiers.values())
+        print(f"{depth:>6}{len(graph.blocks):>8}{size:>10}{frontier_time:>15.4f}{phi_time:>12.4f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Time dominance frontier computation and phi placement on deeply nested loops")
+    parser.add_argument("depths", nargs="*", type=int, default=[10, 50, 100, 200, 400], help="loop nesting depths to try")
+    parser.add_argument("-w", "--width", type=int, default=1, help="straight-line blocks in each loop body")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="runs per depth, the fastest is reported")
+    args = parser.parse_args()
+    benchmark(args.depths, args.width, args.repeat)
+
+if __name__ == "__main__":
+    main()
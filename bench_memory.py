@@ -0,0 +1,142 @@
+import sys
+import glob
+import random
+import argparse
+import tracemalloc
+import blocks
+import relabel
+import bril_parser
+import bril_gen
+import utils
+import cfg
+
+def traced(fn):
+    # (return value, bytes still allocated by fn once it returns)
+    tracemalloc.start()
+    value = fn()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+def traced_peak(fn):
+    # (return value, peak bytes allocated while fn ran)
+    tracemalloc.start()
+    value = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return value, peak
+
+def random_graph(rng: random.Random, n_vertices: int, degree: int):
+    # Vertex names and (id, id) edges of a random graph with about degree neighbors
+    # per vertex, so edges grow linearly with vertices
+    names = [f"v{i}" for i in range(n_vertices)]
+    edges = set()
+    while len(edges) < n_vertices * degree // 2:
+        i = rng.randrange(n_vertices)
+        j = rng.randrange(n_vertices)
+        if i != j:
+            edges.add((min(i, j), max(i, j)))
+    return names, sorted(edges)
+
+def measure_coloring(names: list, edges: list, k: int):
+    """
+    Measures the peak memory of graph coloring on one graph, built outside the
+    traced region so only what simplify and select allocate is counted
+
+    Args:
+        names: Vertex names in id order
+        edges: (id, id) pairs
+        k: Number of registers
+
+    Returns:
+        Peak bytes allocated by color_graph, including the allocation it returns
+    """
+    graph = cfg.Graph.from_edge_list(names, edges)
+    spill_costs = [1] * len(names)
+    _, peak = traced_peak(lambda: cfg.color_graph(graph, k, spill_costs))
+    return peak
+
+def check_coloring_memory(sizes: list, degree: int, k: int, seed: int):
+    # Graph coloring used to deep-copy the graph and its stack on every retry. Without
+    # the copies its peak memory is linear in vertices plus edges, so the bytes per
+    # vertex and edge should stay flat as the graph grows. Returns False if they more
+    # than double from the smallest graph to the largest.
+    rng = random.Random(seed)
+    print(f"{'vertices':>10}{'edges':>10}{'peak (B)':>14}{'B/(V+E)':>10}")
+    per_element = []
+    for size in sizes:
+        names, edges = random_graph(rng, size, degree)
+        peak = measure_coloring(names, edges, k)
+        per_element.append(peak / (len(names) + len(edges)))
+        print(f"{len(names):>10}{len(edges):>10}{peak:>14}{per_element[-1]:>10.1f}")
+    if per_element[-1] > 2 * per_element[0]:
+        print("Graph coloring peak memory grows faster than linearly")
+        return False
+    return True
+
+def measure_function(func: dict):
+    """
+    Measures the memory the analyses of one function keep alive
+
+    Args:
+        func: Function in the JSON form bril2json produces
+
+    Returns:
+        (blocks, interference vertices, interference edges, bytes of the blocks,
+        bytes of the CFG with liveness, bytes of the interference graph)
+    """
+    def form():
+        fn_blocks = blocks.form_blocks(func)
+        for block in fn_blocks.values():
+            block.reinitialize_vars()
+        return fn_blocks
+    fn_blocks, block_bytes = traced(form)
+
+    def analyze():
+        graph = cfg.CFG(fn_blocks, func.get('args'))
+        graph.compute_liveness()
+        return graph
+    graph, cfg_bytes = traced(analyze)
+    # Building the graph also allocates its temporary bitvectors, so its own footprint
+    # is measured on a replay of the same edges, numbered by the function's symbols
+    interference = cfg.build_interference_graph(graph, (graph.live_in_bits, graph.live_out_bits))
+    names = [vertex.name if vertex is not None else None for vertex in interference.vertex_objs]
+    edges = [(i, j) for i, neighbors in enumerate(interference.adj) for j in neighbors if i < j]
+    del interference
+    interference, graph_bytes = traced(lambda: cfg.Graph.from_edge_list(names, edges, graph.symbols))
+    return len(fn_blocks), interference.vertex_count(), len(edges), block_bytes, cfg_bytes, graph_bytes
+
+def print_row(name: str, totals: list):
+    n_blocks, n_vertices, n_edges, block_bytes, cfg_bytes, graph_bytes = totals
+    per_edge = graph_bytes / n_edges if n_edges > 0 else 0
+    print(f"{name:<24}{n_blocks:>8}{n_vertices:>10}{n_edges:>10}{block_bytes / n_blocks:>14.0f}{cfg_bytes / n_blocks:>14.0f}{per_edge:>14.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per block and per interference edge on the tests/ and synthetic corpora, and peak memory of graph coloring as graphs grow")
+    parser.add_argument("sizes", nargs="*", type=int, default=[100, 1000, 3000], help="block counts of the synthetic programs")
+    parser.add_argument("--tests", default="tests", help="directory of -relabeled.json files")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--coloring-sizes", type=int, nargs="+", default=[1000, 4000, 16000], metavar="N", help="vertex counts of the random graphs graph coloring is measured on")
+    parser.add_argument("--degree", type=int, default=8, help="average degree of the random graphs")
+    parser.add_argument("-k", type=int, default=8, help="registers to color the random graphs with")
+    args = parser.parse_args()
+
+    print(f"{'corpus':<24}{'blocks':>8}{'vertices':>10}{'edges':>10}{'block (B)':>14}{'cfg/block (B)':>14}{'edge (B)':>14}")
+    # The tests are summed over every function, since most of them are only a few blocks
+    totals = [0] * 6
+    for filename in sorted(glob.glob(f"{args.tests}/*-relabeled.json")):
+        with open(filename, 'r') as f:
+            for func in utils.read_json_file(f)['functions']:
+                totals = [a + b for a, b in zip(totals, measure_function(func))]
+    if totals[0] > 0:
+        print_row(args.tests, totals)
+    for size in args.sizes:
+        lines = bril_gen.generate_program(args.seed, size)
+        func = next(bril_parser.iter_functions(relabel.relabel_stream(lines)))
+        print_row(f"synthetic {size}", measure_function(func))
+    print()
+    if not check_coloring_memory(args.coloring_sizes, args.degree, args.k, args.seed):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
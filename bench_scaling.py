@@ -0,0 +1,140 @@
+import io
+import sys
+import copy
+import json
+import time
+import argparse
+import contextlib
+import tracemalloc
+import blocks
+import relabel
+import bril_parser
+import bril_gen
+import cfg
+
+PHASES = ["parse", "form_blocks", "dominators", "loops", "liveness", "intervals", "interference", "spill_costs", "moves", "linear_scan", "graph_coloring", "ssa"]
+
+def run_phases(lines: list, reg_count: int, memory = False):
+    """
+    Runs the pipeline on the first function of a program, one phase at a time
+
+    Args:
+        lines: Bril text of the program
+        reg_count: Registers for both allocators
+        memory: Also record each phase's peak traced memory, which slows every phase down
+
+    Returns:
+        Dict of phase -> (seconds, peak bytes or None), plus the number of blocks,
+        interference graph vertices and interference edges
+    """
+    results = dict()
+
+    def phase(name, fn):
+        if memory:
+            tracemalloc.start()
+        start_time = time.perf_counter()
+        value = fn()
+        elapsed = time.perf_counter() - start_time
+        peak = None
+        if memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results[name] = (elapsed, peak)
+        return value
+
+    func = phase("parse", lambda: next(bril_parser.iter_functions(relabel.relabel_stream(lines))))
+    # SSA renaming rewrites the instructions, so it gets its own copy
+    ssa_func = copy.deepcopy(func)
+
+    def form():
+        fn_blocks = blocks.form_blocks(func)
+        for block in fn_blocks.values():
+            block.reinitialize_vars()
+        return fn_blocks
+    fn_blocks = phase("form_blocks", form)
+    graph = phase("dominators", lambda: cfg.CFG(fn_blocks, func.get('args')))
+    phase("loops", lambda: graph.loops)
+    analysis = cfg.FunctionAnalysis(graph)
+    phase("liveness", lambda: analysis.liveness)
+    phase("intervals", lambda: analysis.intervals)
+    phase("interference", lambda: analysis.graph)
+    phase("spill_costs", lambda: analysis.spill_costs)
+    phase("moves", lambda: analysis.moves)
+    phase("linear_scan", lambda: cfg.linear_scan(analysis, reg_count))
+    phase("graph_coloring", lambda: cfg.coalesce_color_graph(analysis.graph, reg_count, analysis.spill_costs, analysis.moves))
+
+    # SSA conversion gets a CFG of its own, built outside the timed region
+    ssa_blocks = blocks.form_blocks(ssa_func)
+    for block in ssa_blocks.values():
+        block.reinitialize_vars()
+    ssa_cfg = cfg.CFG(ssa_blocks, ssa_func.get('args'))
+
+    def ssa():
+        with contextlib.redirect_stdout(io.StringIO()):
+            ssa_cfg.convert_to_SSA()
+    phase("ssa", ssa)
+    return results, len(fn_blocks), analysis.graph.vertex_count(), analysis.graph.edge_count()
+
+def plot(records: list, outfile: str, memory: bool):
+    # The last panel shows how the interference graph grows with the blocks, so the
+    # allocator timings can be read against the size of what they work on
+    import matplotlib.pyplot as plt
+    n_plots = 3 if memory else 2
+    fig, axes = plt.subplots(1, n_plots, figsize=(7 * n_plots, 5), squeeze=False)
+    sizes = [record['blocks'] for record in records]
+    for name in PHASES:
+        axes[0][0].plot(sizes, [record['time'][name] for record in records], marker='o', label=name)
+        if memory:
+            axes[0][1].plot(sizes, [record['peak_bytes'][name] / 1e6 for record in records], marker='o', label=name)
+    for key in ("vertices", "edges"):
+        axes[0][-1].plot(sizes, [record[key] for record in records], marker='o', label=key)
+    axes[0][0].set_ylabel("Time (s)")
+    if memory:
+        axes[0][1].set_ylabel("Peak memory (MB)")
+    axes[0][-1].set_ylabel("Interference graph size")
+    for ax in axes[0]:
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("Blocks")
+        ax.legend()
+    fig.tight_layout()
+    fig.savefig(outfile)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time (and optionally measure memory of) each pipeline phase on synthetic programs of growing size")
+    parser.add_argument("sizes", nargs="*", type=int, default=[100, 300, 1000, 3000], help="block counts to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=3, help="maximum loop nesting depth")
+    parser.add_argument("--branch-density", type=float, default=0.3)
+    parser.add_argument("--vars", type=int, default=16, help="number of long-lived variables")
+    parser.add_argument("--pressure", type=int, default=4, help="temporaries live at once in each block")
+    parser.add_argument("-k", "--reg-count", type=int, default=10)
+    parser.add_argument("--memory", action="store_true", help="record peak memory per phase with tracemalloc")
+    parser.add_argument("-o", "--output", help="write one JSON line per size")
+    parser.add_argument("--plot", metavar="FILE", help="save time (and memory) per phase against size")
+    args = parser.parse_args()
+
+    records = []
+    print(f"{'blocks':>8}{'vertices':>10}{'edges':>10}" + "".join(f"{name:>15}" for name in PHASES))
+    for size in args.sizes:
+        lines = bril_gen.generate_program(args.seed, size, args.depth, args.branch_density, args.vars, args.pressure)
+        results, n_blocks, n_vertices, n_edges = run_phases(lines, args.reg_count, args.memory)
+        record = {'size': size, 'blocks': n_blocks, 'vertices': n_vertices, 'edges': n_edges,
+                  'time': {name: results[name][0] for name in PHASES}}
+        if args.memory:
+            record['peak_bytes'] = {name: results[name][1] for name in PHASES}
+        records.append(record)
+        print(f"{n_blocks:>8}{n_vertices:>10}{n_edges:>10}" + "".join(f"{results[name][0]:>15.4f}" for name in PHASES))
+        if args.memory:
+            print(f"{'MB':>28}" + "".join(f"{results[name][1] / 1e6:>15.2f}" for name in PHASES))
+        sys.stdout.flush()
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+    if args.plot is not None:
+        plot(records, args.plot, args.memory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import statistics
+import blocks
+import relabel
+import bril_parser
+import utils
+import batch
+import cfg
+
+FIELDS = ['file', 'function', 'allocator', 'reg_count', 'warmup', 'trials', 'median_ns', 'p90_ns', 'p99_ns',
+          'min_ns', 'max_ns', 'mean_ns', 'spills', 'registers_used']
+
+def percentile(samples: list, q: float):
+    # Linear interpolation between the closest ranks; samples must be sorted
+    pos = (len(samples) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(samples) - 1)
+    return samples[low] + (samples[high] - samples[low]) * (pos - low)
+
+def load_functions(path: str):
+    # JSON from bril2json, relabeled Bril text, or plain Bril text which is relabeled first
+    with open(path, 'r') as f:
+        if path.endswith(".json"):
+            yield from utils.read_json_file(f)['functions']
+        elif path.endswith("-relabeled.bril"):
+            yield from bril_parser.iter_functions(f)
+        else:
+            yield from bril_parser.iter_functions(relabel.relabel_stream(f))
+
+def run_allocator(analysis: cfg.FunctionAnalysis, allocator: str, k: int):
+    # Returns the raw allocation, so the timed region doesn't include computing metrics
+    if allocator == "linear_scan":
+        return cfg.linear_scan(analysis, k)
+    return cfg.coalesce_color_graph(analysis.graph, k, analysis.spill_costs, analysis.moves)
+
+def allocation_metrics(allocator: str, result: tuple):
+    # (spills, registers used), counted the same way allocate_function reports them
+    if allocator == "linear_scan":
+        occupancy, _, spills = result
+        return len(spills), occupancy.max_pressure()
+    reg_alloc, spills = result[0], result[1]
+    return len(spills), len(set(reg_alloc.values()) - {None})
+
+def benchmark_function(func: dict, filename: str, reg_counts, allocators = cfg.ALLOCATORS, warmup = 2, trials = 10):
+    """
+    Times each allocator on one function at each register count
+
+    Args:
+        func: Function in the JSON form bril2json produces
+        filename: File the function came from, recorded with the results
+        reg_counts: Register counts to allocate with
+        allocators: Which of cfg.ALLOCATORS to run
+        warmup: Untimed runs before the trials
+        trials: Timed runs, each measured with perf_counter_ns
+
+    Returns:
+        Generator of one record per (allocator, register count) with the median,
+        90th and 99th percentile, min, max and mean time in nanoseconds, plus the
+        spills and registers used
+    """
+    fn_blocks = blocks.form_blocks(func)
+    for block in fn_blocks.values():
+        block.reinitialize_vars()
+    analysis = cfg.FunctionAnalysis(cfg.CFG(fn_blocks, (func['args'] if 'args' in func else None)))
+    # Liveness, intervals and the interference graph are shared by every run, so
+    # they are computed up front rather than inside the first timed trial
+    analysis.intervals
+    analysis.graph
+    analysis.spill_costs
+    analysis.moves
+    for k in reg_counts:
+        for allocator in allocators:
+            for _ in range(warmup):
+                run_allocator(analysis, allocator, k)
+            samples = []
+            for _ in range(trials):
+                start_time = time.perf_counter_ns()
+                result = run_allocator(analysis, allocator, k)
+                samples.append(time.perf_counter_ns() - start_time)
+            samples.sort()
+            spills, registers_used = allocation_metrics(allocator, result)
+            yield {'file': filename, 'function': func['name'], 'allocator': allocator, 'reg_count': k,
+                   'warmup': warmup, 'trials': trials, 'median_ns': int(statistics.median(samples)),
+                   'p90_ns': int(percentile(samples, 90)), 'p99_ns': int(percentile(samples, 99)),
+                   'min_ns': samples[0], 'max_ns': samples[-1], 'mean_ns': int(statistics.fmean(samples)),
+                   'spills': spills, 'registers_used': registers_used}
+
+class RecordWriter:
+    # Writes records as JSON Lines or CSV as they are produced
+    def __init__(self, out, fmt: str):
+        self.out = out
+        self.fmt = fmt
+        self.csv_writer = None
+        if fmt == "csv":
+            self.csv_writer = csv.DictWriter(out, fieldnames=FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, record: dict):
+        if self.csv_writer is not None:
+            self.csv_writer.writerow(record)
+        else:
+            self.out.write(json.dumps(record) + "\n")
+        self.out.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Time both register allocators per function and register count")
+    parser.add_argument("paths", nargs="+", help="Bril files (.bril, -relabeled.bril or .json) or directories of .bril files")
+    parser.add_argument("-k", "--reg-counts", type=cfg.parse_reg_counts, default=[10, 7, 5], help="register counts, low:high or a comma separated list (default: 10,7,5)")
+    parser.add_argument("--allocators", default=",".join(cfg.ALLOCATORS), help="comma separated allocators (default: %(default)s)")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed runs before the trials")
+    parser.add_argument("--trials", type=int, default=10, help="timed runs per allocator and register count")
+    parser.add_argument("-o", "--output", default="-", help="where to write the results, - for stdout (default)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="output format, by default from the output's extension, otherwise jsonl")
+    args = parser.parse_args()
+
+    allocators = args.allocators.split(",")
+    for allocator in allocators:
+        if allocator not in cfg.ALLOCATORS:
+            parser.error(f"unknown allocator {allocator!r}, choose from {', '.join(cfg.ALLOCATORS)}")
+    if args.trials < 1:
+        parser.error("at least one trial is needed")
+    fmt = args.format
+    if fmt is None:
+        fmt = "csv" if args.output.endswith(".csv") else "jsonl"
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(batch.find_bril_files([path]))
+        else:
+            files.append(path)
+
+    out = sys.stdout if args.output == "-" else open(args.output, 'w', newline='')
+    try:
+        writer = RecordWriter(out, fmt)
+        for filename in files:
+            for func in load_functions(filename):
+                for record in benchmark_function(func, filename, args.reg_counts, allocators, args.warmup, args.trials):
+                    writer.write(record)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
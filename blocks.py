@@ -1,8 +1,11 @@
 import sys
-from utils import read_json_file, get_base, get_order
+from utils import read_json_file
+from symbols import SymbolTable, intern_function
 import copy
 
 class PhiNode:
+    __slots__ = ("var", "sources")
+
     def __init__(self, var: str, sources: dict):
         self.var = var
         self.sources = sources # key is the predecessor block, value is the variable
@@ -23,8 +26,16 @@ class PhiNode:
         return len(self.sources) > 1
 
 class Block:
-    def __init__(self, instrs: list, id, preds: set, succs: set):
+    # A function can have tens of thousands of blocks, so blocks have no __dict__ and
+    # the analysis fields most blocks never need (phi nodes, per-instruction liveness,
+    # the live in/out name sets) are only allocated on first use
+    __slots__ = ("instrs", "id", "preds", "succs", "used_vars", "defined_vars", "out_vars", "in_vars",
+                 "killed_vars", "_live_vars_map", "_live_in", "_live_out", "_phi_nodes", "live_bits", "symbols")
+
+    def __init__(self, instrs: list, id, preds: set, succs: set, symbols: SymbolTable = None):
         self.instrs = instrs
+        # Symbol table of the function this block belongs to, shared with its CFG
+        self.symbols = symbols if symbols is not None else SymbolTable()
         self.id = id
         self.preds = preds
         self.succs = succs
@@ -36,15 +47,78 @@ class Block:
         self.in_vars = self.compute_in_vars()
         self.killed_vars = set()
         self.killed_vars = self.compute_killed_vars()
-        self.live_vars_map = dict()
-        self.live_out = set()
-        self.live_in = set()
-        self.phi_nodes = dict()
+        self._live_vars_map = None
+        self._live_in = None
+        self._live_out = None
+        self._phi_nodes = None
+        self.live_bits = None # (variable names, live in bits, live out bits) from CFG.compute_liveness
+
+    @property
+    def live_vars_map(self):
+        if self._live_vars_map is None:
+            self._live_vars_map = dict()
+        return self._live_vars_map
+
+    @live_vars_map.setter
+    def live_vars_map(self, value):
+        self._live_vars_map = value
+
+    @property
+    def phi_nodes(self):
+        if self._phi_nodes is None:
+            self._phi_nodes = dict()
+        return self._phi_nodes
+
+    @phi_nodes.setter
+    def phi_nodes(self, value):
+        self._phi_nodes = value
+
+    def has_phi_nodes(self):
+        return self._phi_nodes is not None and len(self._phi_nodes) > 0
+
+    def set_live_bits(self, var_names: list, live_in: int, live_out: int):
+        # Liveness is kept as the CFG's bitvectors and only turned into sets of names
+        # when live_in or live_out is read
+        self.live_bits = (var_names, live_in, live_out)
+        self._live_in = None
+        self._live_out = None
+
+    def decode_live_bits(self, which: int):
+        variables = set()
+        if self.live_bits is None:
+            return variables
+        var_names = self.live_bits[0]
+        bits = self.live_bits[which]
+        while bits:
+            low = bits & -bits
+            variables.add(var_names[low.bit_length() - 1])
+            bits ^= low
+        return variables
+
+    @property
+    def live_in(self):
+        if self._live_in is None:
+            self._live_in = self.decode_live_bits(1)
+        return self._live_in
+
+    @live_in.setter
+    def live_in(self, value):
+        self._live_in = value
+
+    @property
+    def live_out(self):
+        if self._live_out is None:
+            self._live_out = self.decode_live_bits(2)
+        return self._live_out
+
+    @live_out.setter
+    def live_out(self, value):
+        self._live_out = value
     
     def __str__(self):
         result = f"ID: {self.id}\nInstructions: \n"
         result += f"Phi nodes: \n"
-        for phi, node in self.phi_nodes.items():
+        for phi, node in (self._phi_nodes or {}).items():
             result += f"{phi}\n"
         for instr in self.instrs:
             # if 'args' in instr:
@@ -119,9 +193,9 @@ class Block:
         return self.out_vars
     
     def compute_killed_vars(self):
-        trimmed_def_vars = [get_base(var) for var in self.defined_vars]
+        def_bases = {self.symbols.base_of(var) for var in self.defined_vars}
         for var in self.in_vars:
-            if get_base(var) in trimmed_def_vars:
+            if self.symbols.base_of(var) in def_bases:
                 self.killed_vars.add(var)
 
         return self.killed_vars
@@ -154,9 +228,10 @@ class Block:
 def form_blocks(program: dict):
     terminators = {'br', 'ret', 'jmp'}
     blocks = dict()
+    table = intern_function(program)
 
     current_block_id = ".start" # Should this be ".start" instead?
-    current_block = Block([], current_block_id, set(), set())
+    current_block = Block([], current_block_id, set(), set(), table)
     last_term = False
     for idx, instr in enumerate(program['instrs']):
         if 'label' not in instr:
@@ -179,18 +254,20 @@ def form_blocks(program: dict):
                 # if the label already exists, we update the current block to this one
                 current_block = blocks[label]
             else:
-                current_block = Block([instr], instr['label'], set([current_block_id]), set())
+                # The block before only becomes a predecessor if it falls through, see below
+                current_block = Block([instr], instr['label'], set(), set(), table)
             if not last_term: # if the last block was a fallthrough, then the last block is a predecessor
                 # it's possible that this is a new label, so we check and update accordingly
                 if label not in blocks:
-                    new_block = Block([], label, set(), set())
+                    new_block = Block([], label, set(), set(), table)
                     blocks.update({label: new_block})
                 blocks[label].preds.add(current_block_id)
                 current_block = blocks[label]
             # update the current block id to match this new block
             current_block_id = instr['label']
 
-        if idx == len(program['instrs']) - 1: # this is the last instruction in the program
+        # a terminator that ends the program still needs its successors, so it falls through to the check below
+        if idx == len(program['instrs']) - 1 and not ('op' in instr and instr['op'] in terminators): # this is the last instruction in the program
             if not current_block:
                 exit(1)
             # this is the last instruction we will handle regardless of whether the next is a terminator
@@ -208,13 +285,13 @@ def form_blocks(program: dict):
                 if instr['labels'][0] in blocks:
                     blocks[instr['labels'][0]].preds.add(current_block_id)
                 else:
-                    new_block = Block([], instr['labels'][0], set([current_block_id]), set())
+                    new_block = Block([], instr['labels'][0], set([current_block_id]), set(), table)
                     blocks.update({instr['labels'][0]: new_block})
                 
                 if instr['labels'][1] in blocks:
                     blocks[instr['labels'][1]].preds.add(current_block_id)
                 else:
-                    new_block = Block([], instr['labels'][1], set([current_block_id]), set())
+                    new_block = Block([], instr['labels'][1], set([current_block_id]), set(), table)
                     blocks.update({instr['labels'][1]: new_block})
 
             elif op == 'jmp':
@@ -224,7 +301,7 @@ def form_blocks(program: dict):
                     blocks[instr['labels'][0]].preds.add(current_block_id)
                 else:
                     # NB: hanged the below line to create a block with no instructions, instead of one containing `instr`
-                    new_block = Block([], instr['labels'][0], set([current_block_id]), set())
+                    new_block = Block([], instr['labels'][0], set([current_block_id]), set(), table)
                     blocks.update({instr['labels'][0]: new_block})
 
             # if there is a return, it is to another function, so we ignore this as the scope changes
@@ -0,0 +1,154 @@
+import sys
+import random
+import argparse
+
+class FunctionGenerator:
+    """
+    Emits one random but valid Bril function as text. Control flow is built from
+    structured pieces (straight-line blocks, if/else diamonds and counting loops),
+    so every label is reachable, every loop terminates and every variable is
+    defined before any use. Each block, loop and branch defines fresh temporaries,
+    so the number of variables (and the interference graph) grows with the
+    program, not just its block count.
+    """
+    def __init__(self, rng: random.Random, blocks: int, depth: int, branch_density: float, n_vars: int, pressure: int):
+        self.rng = rng
+        self.budget = blocks # Labels still to emit
+        self.depth = depth
+        self.branch_density = branch_density
+        self.n_vars = max(1, n_vars)
+        self.pressure = max(1, pressure)
+        self.lines = []
+        self.label_counter = 0
+        self.temp_counter = 0
+
+    def new_label(self):
+        self.label_counter += 1
+        self.budget -= 1
+        return f".b{self.label_counter}"
+
+    def var(self):
+        return f"v{self.rng.randrange(self.n_vars)}"
+
+    def new_temp(self, prefix = "t"):
+        # A name used nowhere else in the function
+        self.temp_counter += 1
+        return f"{prefix}{self.temp_counter}"
+
+    def emit(self, line: str):
+        self.lines.append("  " + line)
+
+    def emit_label(self, label: str):
+        self.lines.append(f"{label}:")
+
+    def straight_line(self):
+        # pressure temporaries are all live at once before being folded into a fresh
+        # sum, which is copied back into one of the long-lived variables
+        temps = [self.new_temp() for _ in range(self.pressure)]
+        for temp in temps:
+            self.emit(f"{temp}: int = add {self.var()} {self.var()};")
+        total = self.new_temp("s")
+        self.emit(f"{total}: int = id {temps[0]};")
+        for temp in temps[1:]:
+            self.emit(f"{total}: int = add {total} {temp};")
+        self.emit(f"{self.var()}: int = id {total};")
+
+    def region(self, level: int, blocks: int):
+        # Emits statements until this region's share of the block budget is used up
+        stop = self.budget - blocks
+        while self.budget > stop:
+            roll = self.rng.random()
+            if level < self.depth and roll < 0.3 and self.budget - stop >= 4:
+                self.loop(level, self.budget - stop)
+            elif roll < 0.3 + self.branch_density and self.budget - stop >= 3:
+                self.diamond(level, self.budget - stop)
+            else:
+                self.emit_label(self.new_label())
+                self.straight_line()
+
+    def loop(self, level: int, available: int):
+        counter = self.new_temp("i")
+        cond = self.new_temp("c")
+        header = self.new_label()
+        body = self.new_label()
+        exit_label = self.new_label()
+        self.emit(f"{counter}: int = const 0;")
+        self.emit_label(header)
+        self.emit(f"{cond}: bool = lt {counter} bound;")
+        self.emit(f"br {cond} {body} {exit_label};")
+        self.emit_label(body)
+        self.straight_line()
+        self.region(level + 1, self.rng.randint(0, available - 3))
+        self.emit(f"{counter}: int = add {counter} one;")
+        self.emit(f"jmp {header};")
+        self.emit_label(exit_label)
+
+    def diamond(self, level: int, available: int):
+        then_label = self.new_label()
+        else_label = self.new_label()
+        join = self.new_label()
+        inner = available - 3
+        then_blocks = self.rng.randint(0, inner)
+        cond = self.new_temp("c")
+        self.emit(f"{cond}: bool = lt {self.var()} {self.var()};")
+        self.emit(f"br {cond} {then_label} {else_label};")
+        self.emit_label(then_label)
+        self.straight_line()
+        self.region(level, then_blocks)
+        self.emit(f"jmp {join};")
+        self.emit_label(else_label)
+        self.straight_line()
+        self.region(level, self.rng.randint(0, inner - then_blocks))
+        self.emit_label(join)
+        self.straight_line()
+
+    def generate(self, name = "main"):
+        self.lines.append(f"@{name} {{")
+        self.emit("one: int = const 1;")
+        self.emit("bound: int = const 3;")
+        for v in range(self.n_vars):
+            self.emit(f"v{v}: int = const {self.rng.randint(-100, 100)};")
+        self.region(0, self.budget)
+        for v in range(self.n_vars):
+            self.emit(f"print v{v};")
+        self.lines.append("}")
+        return self.lines
+
+def generate_program(seed = 0, blocks = 100, depth = 3, branch_density = 0.3, n_vars = 16, pressure = 4, functions = 1):
+    """
+    Generates a seeded synthetic Bril program for scaling benchmarks
+
+    Args:
+        seed: Random seed, the same arguments always give the same program
+        blocks: Approximate number of labeled blocks per function
+        depth: Maximum loop nesting depth
+        branch_density: Probability of an if/else at each statement, besides loops
+        n_vars: Number of long-lived variables, all defined on entry
+        pressure: Number of temporaries live at once in each straight-line block
+        functions: Number of functions; the first is main
+
+    Returns:
+        The program as a list of lines of Bril text
+    """
+    rng = random.Random(seed)
+    lines = []
+    for f in range(functions):
+        generator = FunctionGenerator(rng, blocks, depth, branch_density, n_vars, pressure)
+        lines += generator.generate("main" if f == 0 else f"f{f}")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Bril program")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--blocks", type=int, default=100, help="approximate number of blocks per function")
+    parser.add_argument("--depth", type=int, default=3, help="maximum loop nesting depth")
+    parser.add_argument("--branch-density", type=float, default=0.3, help="probability of an if/else at each statement")
+    parser.add_argument("--vars", type=int, default=16, help="number of long-lived variables")
+    parser.add_argument("--pressure", type=int, default=4, help="temporaries live at once in each block")
+    parser.add_argument("--functions", type=int, default=1)
+    args = parser.parse_args()
+    lines = generate_program(args.seed, args.blocks, args.depth, args.branch_density, args.vars, args.pressure, args.functions)
+    sys.stdout.writelines(line + "\n" for line in lines)
+
+if __name__ == "__main__":
+    main()
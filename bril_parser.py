@@ -0,0 +1,241 @@
+import sys
+import re
+import json
+import time
+import subprocess
+
+# One token per match: comments, @functions, .labels and identifiers, numbers,
+# character literals and punctuation
+TOKEN_RE = re.compile(r"""\s*(?:
+    (?P<comment>\#.*)
+  | (?P<word>[@.]?[A-Za-z_%][\w%.]*)
+  | (?P<number>[-+]?\d+\.\d*|[-+]?\d+)
+  | (?P<char>'[^']*')
+  | (?P<punct>[(){}:;=,<>])
+)""", re.VERBOSE)
+
+class BrilSyntaxError(Exception):
+    pass
+
+def tokenize(lines):
+    """
+    Splits Bril text into tokens, one line at a time
+
+    Args:
+        lines: Any iterable of lines, e.g. an open file
+
+    Returns:
+        Generator of (token, line number) pairs
+    """
+    for line_no, line in enumerate(lines, 1):
+        pos = 0
+        end = len(line.rstrip())
+        while pos < end:
+            match = TOKEN_RE.match(line, pos)
+            if match is None or match.end() == pos:
+                raise BrilSyntaxError(f"line {line_no}: unexpected character {line[pos:].strip()[:1]!r}")
+            pos = match.end()
+            if match.lastgroup != 'comment':
+                yield match.group(match.lastgroup), line_no
+
+def parse_literal(token: str):
+    if token == "true":
+        return True
+    if token == "false":
+        return False
+    if token[0] == "'":
+        return token[1:-1]
+    if "." in token:
+        return float(token)
+    return int(token)
+
+class Parser:
+    def __init__(self, lines):
+        self.tokens = tokenize(lines)
+        self.peeked = None
+        self.line_no = 0
+
+    def peek(self):
+        if self.peeked is None:
+            self.peeked = next(self.tokens, (None, self.line_no))
+        return self.peeked[0]
+
+    def next(self):
+        token = self.peek()
+        self.line_no = self.peeked[1]
+        self.peeked = None
+        return token
+
+    def expect(self, expected: str):
+        token = self.next()
+        if token != expected:
+            raise BrilSyntaxError(f"line {self.line_no}: expected {expected!r}, found {token!r}")
+        return token
+
+    def parse_type(self):
+        name = self.next()
+        if self.peek() == "<":
+            self.next()
+            inner = self.parse_type()
+            self.expect(">")
+            return {name: inner}
+        return name
+
+    def parse_statement(self):
+        # Returns one instruction or label, or None at the closing brace
+        first = self.next()
+        if first == "}":
+            return None
+        if first is None:
+            raise BrilSyntaxError(f"line {self.line_no}: unexpected end of input inside a function")
+        if first.startswith(".") and self.peek() == ":":
+            self.next()
+            return {'label': first[1:]}
+        tokens = [first]
+        while self.peek() != ";":
+            if self.peek() is None or self.peek() == "}":
+                raise BrilSyntaxError(f"line {self.line_no}: missing ';'")
+            tokens.append(self.next())
+        self.next()
+
+        instr = dict()
+        if len(tokens) > 1 and tokens[1] in (":", "="):
+            # Value operation: dest [: type] = op ...
+            instr['dest'] = tokens[0]
+            idx = 1
+            if tokens[1] == ":":
+                # Types are only ever nested with <>, so the type ends at the '='
+                eq = tokens.index("=", 2)
+                instr['type'] = type_from_tokens(tokens[2:eq], self.line_no)
+                idx = eq
+            tokens = tokens[idx + 1:]
+            if len(tokens) == 0:
+                raise BrilSyntaxError(f"line {self.line_no}: missing operation")
+        instr['op'] = tokens[0]
+        if instr['op'] == "const":
+            if len(tokens) != 2:
+                raise BrilSyntaxError(f"line {self.line_no}: const takes exactly one literal")
+            instr['value'] = parse_literal(tokens[1])
+            return instr
+        args = []
+        funcs = []
+        labels = []
+        for token in tokens[1:]:
+            if token[0] == "@":
+                funcs.append(token[1:])
+            elif token[0] == ".":
+                labels.append(token[1:])
+            else:
+                args.append(token)
+        if len(args) > 0:
+            instr['args'] = args
+        if len(funcs) > 0:
+            instr['funcs'] = funcs
+        if len(labels) > 0:
+            instr['labels'] = labels
+        return instr
+
+    def parse_function(self):
+        name = self.next()
+        if name is None:
+            return None
+        if name[0] != "@":
+            raise BrilSyntaxError(f"line {self.line_no}: expected a function, found {name!r}")
+        func = {'name': name[1:]}
+        if self.peek() == "(":
+            self.next()
+            args = []
+            while self.peek() != ")":
+                arg_name = self.next()
+                self.expect(":")
+                args.append({'name': arg_name, 'type': self.parse_type()})
+                if self.peek() == ",":
+                    self.next()
+            self.next()
+            if len(args) > 0:
+                func['args'] = args
+        if self.peek() == ":":
+            self.next()
+            func['type'] = self.parse_type()
+        self.expect("{")
+        instrs = []
+        while True:
+            instr = self.parse_statement()
+            if instr is None:
+                break
+            instrs.append(instr)
+        func['instrs'] = instrs
+        return func
+
+def type_from_tokens(tokens: list, line_no: int):
+    if len(tokens) == 0:
+        raise BrilSyntaxError(f"line {line_no}: missing type")
+    if len(tokens) == 1:
+        return tokens[0]
+    if tokens[1] != "<" or tokens[-1] != ">":
+        raise BrilSyntaxError(f"line {line_no}: malformed type {' '.join(tokens)}")
+    return {tokens[0]: type_from_tokens(tokens[2:-1], line_no)}
+
+def iter_functions(lines):
+    """
+    Parses Bril text into the JSON structures bril2json produces, one function at a time
+
+    Args:
+        lines: Any iterable of lines, e.g. an open file or relabel output
+
+    Returns:
+        Generator of function dicts, so only one function is held in memory at once
+    """
+    parser = Parser(lines)
+    while True:
+        func = parser.parse_function()
+        if func is None:
+            return
+        yield func
+
+def parse_program(text: str):
+    return {'functions': list(iter_functions(text.splitlines()))}
+
+def benchmark(filenames: list, repeat = 5):
+    # Compares this parser with bril2json + json.load on the same files
+    native = 0.0
+    external = None
+    for filename in filenames:
+        with open(filename, 'r') as f:
+            text = f.read()
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            program = parse_program(text)
+        native += (time.perf_counter() - start_time) / repeat
+        try:
+            start_time = time.perf_counter()
+            for _ in range(repeat):
+                result = subprocess.run(["bril2json"], input=text, capture_output=True, text=True, check=True)
+                reference = json.loads(result.stdout)
+            elapsed = (time.perf_counter() - start_time) / repeat
+        except (OSError, subprocess.CalledProcessError):
+            continue
+        external = (external or 0.0) + elapsed
+        if reference != program:
+            print(f"Warning: {filename} parses differently from bril2json")
+    print(f"Native parser: {native:.4f}s for {len(filenames)} files")
+    if external is None:
+        print("bril2json is not available, skipping the comparison")
+    else:
+        print(f"bril2json + json.load: {external:.4f}s ({external / native:.1f}x slower)")
+
+def main():
+    # Without arguments this is a drop-in replacement for bril2json
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(sys.argv[2:])
+        return
+    try:
+        program = {'functions': list(iter_functions(sys.stdin))}
+    except BrilSyntaxError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    json.dump(program, sys.stdout, indent=2, sort_keys=True)
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,40 @@
 import blocks
 import utils
+import bril_parser
+import analysis_cache
+import instrument
+import loops
 import sys
-import copy
 from blocks import PhiNode
-from utils import get_base, get_order
+from symbols import SymbolTable
 import time
 import random
+import collections
+import heapq
+import array
+import itertools
+import io
+import contextlib
+import argparse
+import concurrent.futures
+
+# Phi placement strategies, see CFG.place_phis
+PHI_MODES = ("minimal", "semi-pruned", "pruned")
 
 class CFG:
-    def __init__ (self, blocks: dict, input_vars = None):
+    def __init__ (self, blocks: dict, input_vars = None, cache_entry = None):
         self.input_vars = input_vars
         self.blocks = blocks
+        self.cache_entry = cache_entry # Cached analyses of this function, see analysis_cache.py
+        self.check_cached_topology()
         self.vars = set() # The variables in this program
         self.defs = dict() # The variables and blocks in which they're defined
+        # Names share one symbol table with the blocks; its ids number the liveness bitvectors
+        self.symbols = next(iter(blocks.values())).symbols if len(blocks) > 0 else SymbolTable()
         self.read_variables()
-        self.dominators = self.compute_dominators()
-        self.strict_dominators = self.compute_strict_dominators()
-        self.immediate_dominators = self.compute_immediate_dominators()
-        self.dominance_frontiers = self.compute_dominance_frontiers()
+        self.compute_dominator_tree()
+        with instrument.phase("frontiers"):
+            self.set_dominance_frontiers(self.cached('frontiers', self.compute_dominance_frontiers))
         self.var_stack = dict.fromkeys(self.vars)
         self.counters = dict.fromkeys(self.vars)
         self.func_args = input_vars
@@ -26,13 +43,23 @@ class CFG:
             self.counters[var] = 0
         if self.input_vars is not None:
             for var in self.input_vars:
-                self.var_stack[var['name']] = [var['name'] + ".0"]
+                first_name = self.symbols.versioned(var['name'], 0)
+                self.var_stack[var['name']] = [first_name]
                 self.counters[var['name']] = 1
-                self.blocks['.start'].in_vars.add(var['name'] + ".0")
+                self.blocks['.start'].in_vars.add(first_name)
         self.terminating_blocks = set()
         for block in self.blocks.values():
             if len(block.succs) == 0:
                 self.terminating_blocks.add(block.name())
+        self._loops = None
+
+    @property
+    def loops(self):
+        # Loop-nesting forest, see loops.py. Built on first use and kept, since the
+        # edges between blocks never change once the CFG exists.
+        if self._loops is None:
+            self._loops = loops.LoopForest(self)
+        return self._loops
     
     def __str__(self):
         str = ""
@@ -62,240 +89,472 @@ class CFG:
                     self.vars.add(var)
                 
 
-    def compute_dominators(self):
-        doms = dict()
-        for block_name in self.blocks:
-            doms[block_name] = set(self.blocks.keys())
-            
-        doms[".start"] = {".start"}
+    @instrument.timed("dominators")
+    def compute_dominator_tree(self):
+        rpo, idom = self.cached('dominators', self.compute_idoms)
+        self.set_dominator_tree(rpo, idom)
+        return self.immediate_dominators
+
+    def compute_idoms(self):
+        # Cooper, Harvey and Kennedy, "A Simple, Fast Dominance Algorithm".
+        # Blocks are numbered in reverse postorder so every block's idom has a smaller
+        # number than the block itself, and idoms are kept in a flat array.
+        rpo = self.reverse_postorder()
+        rpo_index = {block_name: idx for idx, block_name in enumerate(rpo)}
+        # Predecessors are taken from the successor edges, only counting reachable blocks
+        preds = [[] for _ in rpo]
+        for idx, block_name in enumerate(rpo):
+            for succ in self.blocks[block_name].succs:
+                preds[rpo_index[succ]].append(idx)
+        idom = [-1] * len(rpo)
+        idom[0] = 0
         changed = True
-        considered_blocks = set(self.blocks.keys()) - set([".start"])
         while changed:
             changed = False
-            for block_name in considered_blocks:
-                new_doms = set(self.blocks.keys())
-                # The dominators of this block are the intersection 
-                # of the dominators of its predecessors
-                for pred in self.blocks[block_name].preds:
-                    new_doms = new_doms.intersection(doms[pred])
-                # Plus itself
-                new_doms.add(block_name)
-                # If the dominators of this block have changed, update them
-                # and trigger a new iteration of the outer loop
-                if new_doms != doms[block_name]:
-                    doms[block_name] = new_doms
+            for b in range(1, len(rpo)):
+                new_idom = -1
+                for p in preds[b]:
+                    if idom[p] == -1:
+                        continue
+                    if new_idom == -1:
+                        new_idom = p
+                        continue
+                    # Walk both fingers up the tree until they meet
+                    finger1 = p
+                    finger2 = new_idom
+                    while finger1 != finger2:
+                        while finger1 > finger2:
+                            finger1 = idom[finger1]
+                        while finger2 > finger1:
+                            finger2 = idom[finger2]
+                    new_idom = finger1
+                if idom[b] != new_idom:
+                    idom[b] = new_idom
                     changed = True
+        return rpo, idom
+
+    def set_dominator_tree(self, rpo: list, idom: list):
+        self.rpo = rpo
+        self.rpo_index = {block_name: idx for idx, block_name in enumerate(rpo)}
+        self.idom = idom
+
+        # Name-keyed views of the same result; unreachable blocks have no idom
+        self.immediate_dominators = dict.fromkeys(self.blocks.keys(), None)
+        self.dom_tree_children = dict()
+        for block_name in self.blocks:
+            self.dom_tree_children[block_name] = []
+        for b in range(1, len(self.rpo)):
+            parent = self.rpo[idom[b]]
+            self.immediate_dominators[self.rpo[b]] = parent
+            self.dom_tree_children[parent].append(self.rpo[b])
+
+        # Pre/post numbering of the dominator tree makes dominance queries O(1)
+        self.dom_pre = dict()
+        self.dom_post = dict()
+        counter = 0
+        stack = [(".start", iter(self.dom_tree_children[".start"]))]
+        self.dom_pre[".start"] = counter
+        while len(stack) > 0:
+            block_name, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                counter += 1
+                self.dom_post[block_name] = counter
+            else:
+                counter += 1
+                self.dom_pre[child] = counter
+                stack.append((child, iter(self.dom_tree_children[child])))
+        self._dominators = None
+        self._strict_dominators = None
+
+    def dominates(self, a: str, b: str):
+        if a == b:
+            return True
+        if a not in self.dom_pre or b not in self.dom_pre:
+            return False
+        return self.dom_pre[a] < self.dom_pre[b] and self.dom_post[b] < self.dom_post[a]
+
+    def strictly_dominates(self, a: str, b: str):
+        return a != b and self.dominates(a, b)
+
+    def compute_dominators(self):
+        # Dominators of a block are the block itself and every block on its idom chain
+        doms = dict()
+        for block_name in self.blocks:
+            doms[block_name] = self.compute_strict_dominators_of(block_name)
+            doms[block_name].add(block_name)
         return doms
 
+    def compute_strict_dominators_of(self, block_name: str):
+        sdoms = set()
+        idom = self.immediate_dominators[block_name]
+        while idom is not None:
+            sdoms.add(idom)
+            idom = self.immediate_dominators[idom]
+        return sdoms
+
     def compute_strict_dominators(self):
         # Strict dominators are simply the dominators minus the block itself
-        doms = self.compute_dominators()
         sdoms = dict()
         for block_name in self.blocks:
-            sdoms[block_name] = doms[block_name] - set([block_name])
+            sdoms[block_name] = self.compute_strict_dominators_of(block_name)
         return sdoms
 
     def compute_immediate_dominators(self):
-        sdoms = self.compute_strict_dominators()
-        idoms = dict.fromkeys(self.blocks.keys(), None)
-        for block_name in self.blocks:
-            # If this block has no strict dominators, skip it
-            if len(sdoms[block_name]) == 0:
-                continue
-            # If this block has only one strict dominator, it is its immediate dominator
-            if len(sdoms[block_name]) == 1:
-                idoms[block_name] = next(iter(sdoms[block_name]))
-                continue
+        return self.immediate_dominators
 
-            # For multiple strict dominators, find the one that is dominated by all others
-            # This will be the "lowest" dominator in the dominator tree
-            candidates = sdoms[block_name].copy()
-            
-            for sdom in sdoms[block_name]:
-                # Remove sdom if it dominates any other candidate
-                # Since it can't be the immediate dominator
-                for other_sdom in sdoms[block_name]:
-                    if other_sdom != sdom and sdom in sdoms[other_sdom]:
-                        candidates.discard(sdom)
-                        break
-            if len(candidates) == 1:
-                idoms[block_name] = next(iter(candidates))
-            else:
-                # If we have multiple candidates, something went wrong
-                print(f"Warning: Multiple or no candidates for {block_name}: {candidates}")
-        return idoms
+    # The full dominator sets are quadratic in size on deep CFGs, so they are
+    # only built if something asks for them
+    @property
+    def dominators(self):
+        if self._dominators is None:
+            self._dominators = self.compute_dominators()
+        return self._dominators
+
+    @property
+    def strict_dominators(self):
+        if self._strict_dominators is None:
+            self._strict_dominators = self.compute_strict_dominators()
+        return self._strict_dominators
 
     def compute_dominance_frontiers(self):
-        dom_frontiers = dict()
-        sdoms = self.compute_strict_dominators()
-        for block_name in self.blocks:
-            dom_frontiers[block_name] = set()
-        for block_name in self.blocks:
-            # The dominance frontier of a block is either a successor
-            # or a successor of a successor
-            check_list = list(self.blocks[block_name].succs)
-            seen = set()
-            while len(check_list) > 0:
-                successor = check_list.pop()
-                if successor in seen:
-                    # prevent infinite iteration
-                    continue
-                elif block_name not in sdoms[successor]:
-                    # if this successor is not strictly dominated by the block
-                    # then it is in the dominance frontier
-                    dom_frontiers[block_name].add(successor)
-                else:
-                    # if it is strictly dominated, add its successors to the check list
-                    check_list.extend(self.blocks[successor].succs)
-                seen.add(successor)
-        return dom_frontiers
+        # Cytron et al.'s frontiers, computed as in Cooper, Harvey and Kennedy: a block
+        # with several predecessors is in the frontier of each predecessor and of
+        # their dominators, up to but not including its own idom. Everything is in
+        # reverse postorder numbers, and unreachable blocks have empty frontiers.
+        # Returns the frontiers in compressed sparse row form: the frontier of block
+        # number b is targets[offsets[b]:offsets[b + 1]].
+        n = len(self.rpo)
+        preds = [[] for _ in range(n)]
+        for b, block_name in enumerate(self.rpo):
+            for succ in self.blocks[block_name].succs:
+                preds[self.rpo_index[succ]].append(b)
+        frontiers = [[] for _ in range(n)]
+        for b in range(n):
+            if len(preds[b]) < 2 and b != 0:
+                continue
+            for p in preds[b]:
+                runner = p
+                # Joins are visited in order, so b is already in a frontier exactly
+                # when it is that frontier's last entry
+                while runner != self.idom[b]:
+                    if len(frontiers[runner]) == 0 or frontiers[runner][-1] != b:
+                        frontiers[runner].append(b)
+                    runner = self.idom[runner]
+                if b == 0:
+                    # The entry has no idom, so a loop back to it also puts it in its own frontier
+                    if len(frontiers[0]) == 0 or frontiers[0][-1] != 0:
+                        frontiers[0].append(0)
+        offsets = array.array('i', [0])
+        targets = array.array('i')
+        for frontier in frontiers:
+            targets.extend(frontier)
+            offsets.append(len(targets))
+        return offsets, targets
+
+    def set_dominance_frontiers(self, frontiers: tuple):
+        self.frontier_offsets, self.frontier_targets = frontiers
+        self._dominance_frontiers = None
+
+    def frontier(self, b: int):
+        # Frontier of the block with reverse postorder number b, as numbers
+        return self.frontier_targets[self.frontier_offsets[b]:self.frontier_offsets[b + 1]]
+
+    @property
+    def dominance_frontiers(self):
+        # Name-keyed view of the frontiers, built on first use
+        if self._dominance_frontiers is None:
+            self._dominance_frontiers = dict()
+            for block_name in self.blocks:
+                self._dominance_frontiers[block_name] = set()
+            for b, block_name in enumerate(self.rpo):
+                self._dominance_frontiers[block_name] = {self.rpo[f] for f in self.frontier(b)}
+        return self._dominance_frontiers
 
+    def place_phis(self, mode = "pruned"):
+        """
+        Finds where phi nodes are needed, without changing any block
 
-    def insert_phi_nodes(self):
+        Args:
+            mode: One of PHI_MODES. "minimal" places a phi for every variable at each
+                block in the iterated dominance frontier of its definitions.
+                "semi-pruned" only considers variables that are used in some block
+                before being defined there, since the rest never cross a block
+                boundary. "pruned" also drops phis for variables that aren't live
+                into the block.
+
+        Returns:
+            Dict of block name -> set of variables that need a phi there
+        """
+        if mode not in PHI_MODES:
+            raise ValueError(f"unknown phi placement mode {mode!r}")
+        arg_names = set()
+        if self.input_vars is not None:
+            arg_names = {arg['name'] for arg in self.input_vars}
+        candidates = self.vars
+        if mode == "semi-pruned":
+            candidates = set()
+            for block in self.blocks.values():
+                defined = set()
+                for instr in block.instrs:
+                    for arg in instr.get('args', []):
+                        if arg not in defined:
+                            candidates.add(arg)
+                    if 'dest' in instr:
+                        defined.add(instr['dest'])
+        elif mode == "pruned":
+            self.compute_liveness()
+
+        placement = dict()
+        for block_name in self.blocks:
+            placement[block_name] = set()
+        for v in self.vars:
+            if v not in candidates:
+                continue
+            # Arguments are defined on entry. Definitions in unreachable blocks never
+            # reach anything, so they need no phis.
+            def_blocks = {self.rpo_index[block_name] for block_name in self.defs[v] if block_name in self.rpo_index}
+            if v in arg_names:
+                def_blocks.add(0)
+            # A phi is a definition too, so every block that gets one is pushed back
+            # on the worklist until the iterated frontier stops growing
+            worklist = list(def_blocks)
+            has_phi = set()
+            while len(worklist) > 0:
+                b = worklist.pop()
+                for f in self.frontier(b):
+                    if f in has_phi:
+                        continue
+                    has_phi.add(f)
+                    block_name = self.rpo[f]
+                    if mode != "pruned" or v in self.blocks[block_name].live_in:
+                        placement[block_name].add(v)
+                    if f not in def_blocks:
+                        def_blocks.add(f)
+                        worklist.append(f)
+        return placement
+
+    @instrument.timed("phi_insertion")
+    def insert_phi_nodes(self, mode = "pruned"):
+        # Returns the number of phi nodes added
         if len(self.blocks) <= 1:
             print(f"Cannot be any phi nodes in a program containing only {len(self.blocks)} blocks")
+            return 0
+        count = 0
+        for block_name, phi_vars in self.place_phis(mode).items():
+            block = self.blocks[block_name]
+            for v in sorted(phi_vars):
+                if v in block.phi_nodes:
+                    continue
+                # One source per predecessor, filled in with the right name by rename
+                block.phi_nodes[v] = PhiNode(v, {pred: v for pred in block.preds})
+                self.defs[v].add(block_name)
+                count += 1
+        instrument.count("phis", count)
+        return count
+
+    def check_cached_topology(self):
+        # Cached analyses are only reused if the blocks came out the same way
+        if self.cache_entry is None:
             return
-        for v in self.vars:
-            new_def_blocks = set()
-            for block in self.defs[v]:
-                for block_inner in self.dominance_frontiers[block]:
-                    if v in self.blocks[block_inner].phi_nodes:
-                        self.blocks[block_inner].phi_nodes[v].sources[block] = v
-                    else:
-                        self.blocks[block_inner].phi_nodes[v] = (PhiNode(v, {block: v}))
-                new_def_blocks.update(self.dominance_frontiers[block])
-            self.defs[v].update(new_def_blocks)
-            new_def_blocks = set()
-            while len(new_def_blocks) > 0:
-                block = new_def_blocks.pop()
-                for block_inner in self.dominance_frontiers[block]:
-                    if v in self.blocks[block_inner].phi_nodes:
-                        self.blocks[block_inner].phi_nodes[v].sources[block] = v
-                    else:
-                        self.blocks[block_inner].phi_nodes[v] = (PhiNode(v, {block: v}))
-                        new_def_blocks.add(block_inner)
-                        self.defs[v].add(block_inner)
-        return
+        topology = {block_name: sorted(block.succs) for block_name, block in self.blocks.items()}
+        cached = self.cache_entry.get('topology')
+        if cached != topology:
+            if cached is not None:
+                self.cache_entry.reset()
+            self.cache_entry.put('topology', topology)
+
+    def cached(self, section: str, compute):
+        # Returns the cached result of an analysis, computing and storing it on a miss
+        if self.cache_entry is None:
+            return compute()
+        result = self.cache_entry.get(section)
+        if result is None:
+            result = compute()
+            self.cache_entry.put(section, result)
+        return result
+
+    def postorder(self):
+        # Iterative DFS from .start, so deep CFGs don't hit the recursion limit
+        order = []
+        seen = {".start"}
+        stack = [(".start", iter(sorted(self.blocks[".start"].succs)))]
+        while len(stack) > 0:
+            block_name, succs = stack[-1]
+            for succ in succs:
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append((succ, iter(sorted(self.blocks[succ].succs))))
+                    break
+            else:
+                stack.pop()
+                order.append(block_name)
+        return order
+
+    def reverse_postorder(self):
+        return list(reversed(self.postorder()))
+
+    def var_bit(self, var: str):
+        # Sets of variables are kept as int bitvectors indexed by symbol id
+        return 1 << self.symbols.intern(var)
+
+    def vars_to_bits(self, variables):
+        bits = 0
+        for var in variables:
+            bits |= self.var_bit(var)
+        return bits
 
-    def compute_liveness(self, do_time = False):
+    @instrument.timed("liveness")
+    def compute_liveness(self):
+        self.use_bits = dict()
+        self.def_bits = dict()
+        cached = None
+        if self.cache_entry is not None:
+            cached = self.cache_entry.get('liveness')
+        # The cached bitvectors are only usable under the numbering they were computed
+        # with; symbol tables number a function's names in instruction order, so that
+        # only fails if something else was interned first
+        if cached is not None and not self.symbols.adopt(cached['var_names']):
+            cached = None
         # Initialize the blocks
         for block in self.blocks.values():
             block.compute_used_and_defined_vars(None)
-            block.live_out = set()
-            block.live_in = set()
-        # Create worklist
-        worklist = copy.deepcopy(self.terminating_blocks)
-        start_time = time.time()
-        while True:
-            # Continue until no changes are made
-            changed = False
-            # This prevents infinite loops
-            blocks_seen = set()
-            while len(worklist) > 0:
-                # Work through blocks in reverse-post order
-                block = self.blocks[worklist.pop()]
-                old_live_in = copy.deepcopy(block.live_in)
-                old_live_out = copy.deepcopy(block.live_out)
-                blocks_seen.add(block.name())
-                # Compute live out variables
-                for succ in block.succs:
-                    block.live_out = block.live_out.union(self.blocks[succ].live_in)
-                # Compute live in variables
-                block.live_in = block.used_vars.union(block.live_out - block.defined_vars)
-                # Check if changes were made
-                if old_live_in != block.live_in or old_live_out != block.live_out:
-                    changed = True
-                # Add predecessors to worklist
-                for pred in block.preds:
-                    # This prevents infinite loops
-                    if pred not in blocks_seen:
-                        worklist.add(pred)
-            if not changed:
-                break
-        end_time = time.time() 
-        if do_time:
-            print("Computing Liveness Time taken: ", end_time - start_time)
+            self.use_bits[block.name()] = self.vars_to_bits(block.used_vars)
+            self.def_bits[block.name()] = self.vars_to_bits(block.defined_vars)
+        if cached is not None:
+            self.live_in_bits = dict(cached['live_in'])
+            self.live_out_bits = dict(cached['live_out'])
+        else:
+            self.solve_liveness()
+            if self.cache_entry is not None:
+                self.cache_entry.put('liveness', {'var_names': list(self.symbols.names),
+                                                  'live_in': dict(self.live_in_bits),
+                                                  'live_out': dict(self.live_out_bits)})
+        # Blocks turn these into sets of variable names when they are first read
+        for block_name, block in self.blocks.items():
+            block.set_live_bits(self.symbols.names, self.live_in_bits[block_name], self.live_out_bits[block_name])
         return
 
+    def solve_liveness(self):
+        self.live_in_bits = dict.fromkeys(self.blocks.keys(), 0)
+        self.live_out_bits = dict.fromkeys(self.blocks.keys(), 0)
+        # Liveness is a backward problem, so the postorder of the CFG (reverse postorder
+        # of the reversed CFG) is the order that converges fastest. Blocks unreachable
+        # from .start are still analyzed, after the reachable ones.
+        order = self.postorder()
+        reached = set(order)
+        order += [name for name in self.blocks if name not in reached]
+        worklist = collections.deque(order)
+        in_worklist = set(order)
+        visits = 0
+        while len(worklist) > 0:
+            block_name = worklist.popleft()
+            in_worklist.discard(block_name)
+            visits += 1
+            block = self.blocks[block_name]
+            # Compute live out variables
+            live_out = 0
+            for succ in block.succs:
+                live_out |= self.live_in_bits[succ]
+            self.live_out_bits[block_name] = live_out
+            # Compute live in variables
+            live_in = self.use_bits[block_name] | (live_out & ~self.def_bits[block_name])
+            if live_in != self.live_in_bits[block_name]:
+                self.live_in_bits[block_name] = live_in
+                # Only predecessors can observe the change
+                for pred in block.preds:
+                    if pred not in in_worklist:
+                        in_worklist.add(pred)
+                        worklist.append(pred)
+        instrument.count("liveness_block_visits", visits)
+
     def is_phi(self, instr: dict):
-        return instr['op'] == 'phi'
+        return instr.get('op') == 'phi'
     
     def get_new_name(self, var: str):
-        new_name = var + "." + str(self.counters[var])
+        new_name = self.symbols.versioned(var, self.counters[var])
         self.counters[var] += 1
         return new_name
     
     def get_current_name(self, var: str):
-        res = peek(self.var_stack[var])
-        if res is None:
-            return var + ".0"
-        return res
-
-    def rename(self, block: blocks.Block, recursive_depth = 0, source_name = None):
-        old_stacks = dict()
-        for key, _ in self.var_stack.items():
-            old_stacks[key] = copy.deepcopy(self.var_stack[key])
-        for var, node in block.phi_nodes.items():
-            if source_name in node.sources.keys():
-                value = node.sources[source_name]
-                new_args = dict()
-                nval = self.get_current_name(get_base(value))
-                node.sources[source_name] = nval
+        stack = self.var_stack[var]
+        if len(stack) == 0:
+            return self.symbols.versioned(var, 0)
+        return stack[-1]
+
+    @instrument.timed("rename")
+    def rename(self, root = ".start"):
+        # Walks the dominator tree with an explicit stack, so deep CFGs can't hit the
+        # recursion limit. Each block remembers which variables it pushed a name for,
+        # and on the way back up exactly those stacks are popped, so undoing a block
+        # costs as much as renaming it did.
+        walk = [(root, False)]
+        pushed = dict() # Block -> the variables it pushed a name for, once per push
+        while len(walk) > 0:
+            block_name, leaving = walk.pop()
+            if leaving:
+                for var in pushed.pop(block_name):
+                    self.var_stack[var].pop()
+                continue
+            pushed[block_name] = self.rename_block(self.blocks[block_name])
+            walk.append((block_name, True))
+            # Reversed so children are visited in order
+            for child in reversed(self.dom_tree_children[block_name]):
+                walk.append((child, False))
+
+    def rename_block(self, block: blocks.Block):
+        symbols = self.symbols
+        pushed = []
+        # Checked first so blocks without phis never allocate a phi table
+        if block.has_phi_nodes():
+            for var, node in block.phi_nodes.items():
                 new_dest = self.get_new_name(var)
                 self.var_stack[var].append(new_dest)
+                pushed.append(var)
                 node.var = new_dest
-            
         for instr in block.instrs:
-            if 'args' in instr:
-                new_args = []
-                for arg in instr['args']:
-                    new_arg = self.get_current_name(get_base(arg))
-                    new_args.append(new_arg)
-                instr['args'] = new_args
+            # A phi's arguments come from its predecessors, which fill them in below
+            if 'args' in instr and not self.is_phi(instr):
+                instr['args'] = [self.get_current_name(symbols.base_name(arg)) for arg in instr['args']]
             if 'dest' in instr:
-                d_arg = get_base(instr['dest'])
+                d_arg = symbols.base_name(instr['dest'])
                 new_dest = self.get_new_name(d_arg)
                 self.var_stack[d_arg].append(new_dest)
+                pushed.append(d_arg)
                 instr['dest'] = new_dest
         for s in block.succs:
-            for instr in self.blocks[s].instrs:
+            succ = self.blocks[s]
+            if succ.has_phi_nodes():
+                for var, node in succ.phi_nodes.items():
+                    node.sources[block.name()] = self.get_current_name(var)
+            for instr in succ.instrs:
                 if self.is_phi(instr):
                     # For a phi node, all arguments should have the same base
-                    curr_name = self.get_current_name(instr['base'])
+                    curr_name = self.get_current_name(instr.get('base', symbols.base_name(instr['dest'])))
                     if curr_name not in instr['args']:
                         instr['args'].append(curr_name)
                         instr['labels'].append(block.name())
-
-        ext_idoms = self.get_idominated_blocks(block)
-        for idom in ext_idoms:
-            self.rename(self.blocks[idom], recursive_depth + 1, block.name())
-            self.rename(self.blocks[idom], recursive_depth + 1, block.name())
-
-        for key, _ in self.var_stack.items():
-            self.var_stack[key] = copy.deepcopy(old_stacks[key])
+        return pushed
 
     def get_idominated_blocks(self, block: blocks.Block):
-        ext_idoms = set()
-        for block_i in self.blocks.values():
-            if self.immediate_dominators[block_i.name()] is not None and block.name() in self.immediate_dominators[block_i.name()]:
-                ext_idoms.add(block_i.name())
-        return ext_idoms
+        return set(self.dom_tree_children[block.name()])
 
-    def convert_to_SSA(self):
-        self.insert_phi_nodes()
-        self.rename(self.blocks[".start"])
+    def convert_to_SSA(self, mode = "pruned"):
+        # Renaming rewrites the instructions, so cached analyses no longer apply
+        self.cache_entry = None
+        self.insert_phi_nodes(mode)
+        self.rename()
 
     def build_interference_graph(self):
-        graph = Graph([], [])
+        graph = Graph([], [], self.symbols)
         for var in self.vars:
-            vertex = Vertex(var)
-            graph.add_vertex(vertex)
+            graph.vertex(var)
         for block in self.blocks.values():
             for var in block.in_vars:
                 for var_inner in block.in_vars:
                     if var != var_inner:
-                        if not graph.contains_edge(Vertex(var), Vertex(var_inner)):
-                            graph.add_edge(Vertex(var), Vertex(var_inner))
+                        graph.add_edge(graph.vertex(var), graph.vertex(var_inner))
         return graph
     
     def convert_to_riscv_instrs(self, outfile):
@@ -307,6 +566,9 @@ class CFG:
                     continue
                 f.write("." + block.name() + ":\n")
                 for instr in block.instrs:
+                    # The block's own label was written above
+                    if 'label' in instr:
+                        continue
                     op = ''
                     args = []
                     dest = ''
@@ -324,25 +586,27 @@ class CFG:
                         elif op == 'eq':
                             op = 'sub'
                     str_instr += op + " "
-                if 'dest' in instr:
-                    str_instr += instr['dest'] + ", "
-                if 'args' in instr:
-                    for arg in instr['args']:
-                        args.append(arg)
-                str_instr += ", ".join(args)
-                if op == 'ret':
-                    str_instr = "mv a0, " + instr['args'][0]
-                    f.write('\t' + str_instr + "\n")
-                    f.write('\tjr ra' + "\n")
-                elif op == 'br':
-                    op = 'beq'
-                    args.append('zero')
-                    args.append('.' + instr['labels'][0])
-                    str_instr = op + " " + ", ".join(args)
-                    f.write('\t' + str_instr + "\n")
-                    f.write('\tj ' + instr['labels'][1] + "\n")
-                else:
-                    f.write('\t' + str_instr + "\n")
+                    if 'dest' in instr:
+                        str_instr += instr['dest'] + ", "
+                    if 'args' in instr:
+                        for arg in instr['args']:
+                            args.append(arg)
+                    str_instr += ", ".join(args)
+                    if op == 'ret':
+                        # A bare ret has no value to return
+                        if 'args' in instr:
+                            str_instr = "mv a0, " + instr['args'][0]
+                            f.write('\t' + str_instr + "\n")
+                        f.write('\tjr ra' + "\n")
+                    elif op == 'br':
+                        op = 'beq'
+                        args.append('zero')
+                        args.append('.' + instr['labels'][0])
+                        str_instr = op + " " + ", ".join(args)
+                        f.write('\t' + str_instr + "\n")
+                        f.write('\tj ' + instr['labels'][1] + "\n")
+                    else:
+                        f.write('\t' + str_instr + "\n")
 
 def peek(stack: list):
     if len(stack) == 0:
@@ -354,22 +618,106 @@ def shift_left(stack: list):
         return []
     return stack[1:]
 
-def build_interference_graph(cfg: CFG, do_time = False):
-    start_time = time.time()
-    cfg.compute_liveness()
-    graph = Graph([], [])
+def interference_bits(cfg: CFG, liveness: tuple):
+    """
+    Finds which variables interfere, one instruction at a time. Each block is walked
+    backward from its live out bitvector; a definition interferes with everything
+    live just after it, except the source of an id, which may share its register.
+    Function arguments are all defined on entry, so they interfere with everything
+    live there. Neighbors are collected as bitvectors, which deduplicates the edges
+    as they are found.
+
+    Args:
+        cfg: The function's CFG
+        liveness: (live in, live out) bitvectors per block from CFG.compute_liveness
+
+    Returns:
+        Dict of symbol id -> bitvector of the symbol ids it interferes with, holding
+        each edge in at least the direction it was found in
+    """
+    live_in_bits, live_out_bits = liveness
+    symbols = cfg.symbols
+    intern = symbols.intern
+    adj = dict()
+    for block_name, block in cfg.blocks.items():
+        live = live_out_bits[block_name]
+        for instr in reversed(block.instrs):
+            args = instr.get('args')
+            if 'dest' in instr:
+                bit = 1 << intern(instr['dest'])
+                others = live & ~bit
+                if instr.get('op') == 'id':
+                    others &= ~(1 << intern(args[0]))
+                if others:
+                    d = intern(instr['dest'])
+                    adj[d] = adj.get(d, 0) | others
+                live &= ~bit
+            if args is not None:
+                for arg in args:
+                    live |= 1 << intern(arg)
+    if cfg.func_args is not None and '.start' in cfg.blocks:
+        live = live_in_bits['.start']
+        for arg in cfg.func_args:
+            a = intern(arg['name'])
+            others = live & ~(1 << a)
+            if others:
+                adj[a] = adj.get(a, 0) | others
+    return adj
+
+def precise_interference_graph(cfg: CFG, liveness: tuple):
+    # Graph of interference_bits, plus its edges as id pairs in the order they were
+    # added. The bits are symbol ids and so are the graph's vertex ids, so they are
+    # used as is. Vertices and edges go in in id order, so the graph doesn't depend
+    # on set iteration order.
+    symbols = cfg.symbols
+    graph = Graph([], [], symbols)
+    for var in sorted(cfg.vars, key=symbols.intern):
+        graph.vertex(var)
+    vertex_objs = graph.vertex_objs
+    added = []
+    for i, bits in sorted(interference_bits(cfg, liveness).items()):
+        if i >= len(vertex_objs) or vertex_objs[i] is None:
+            graph.vertex(symbols.names[i])
+        while bits:
+            low = bits & -bits
+            j = low.bit_length() - 1
+            if j >= len(vertex_objs) or vertex_objs[j] is None:
+                graph.vertex(symbols.names[j])
+            if graph.add_edge_ids(i, j):
+                added.append((i, j))
+            bits ^= low
+    return graph, added
+
+def block_interference_graph(cfg: CFG):
+    # The earlier builder: everything defined in a block interferes with everything
+    # live out of it. Only used by interference_report to compare against.
+    graph = Graph([], [], cfg.symbols)
     for var in cfg.vars:
-        graph.add_vertex(Vertex(var))
+        graph.vertex(var)
     for block in cfg.blocks.values():
         for var in block.defined_vars:
+            i = graph.find(var)
             for var_inner in block.live_out:
-                if var != var_inner:
-                    e = Edge(Vertex(var), Vertex(var_inner))
-                    if e not in graph.edges:
-                        graph.add_edge(Vertex(var), Vertex(var_inner))
-    end_time = time.time()
-    if do_time:
-        print("Interference Graph Generation Time Elapsed: ", end_time - start_time)
+                graph.add_edge_ids(i, graph.vertex_id(graph.vertex(var_inner)))
+    return graph
+
+@instrument.timed("interference")
+def build_interference_graph(cfg: CFG, liveness = None):
+    # liveness is (live in, live out) bitvectors per block, computed here if not given
+    if liveness is None:
+        cfg.compute_liveness()
+        liveness = (cfg.live_in_bits, cfg.live_out_bits)
+    graph = None
+    if cfg.cache_entry is not None:
+        cached = cfg.cache_entry.get('interference')
+        if cached is not None:
+            graph = Graph.from_edge_list(*cached, cfg.symbols)
+    if graph is None:
+        graph, added = precise_interference_graph(cfg, liveness)
+        if cfg.cache_entry is not None:
+            names = [v.name if v is not None else None for v in graph.vertex_objs]
+            cfg.cache_entry.put('interference', (names, added))
+        instrument.count("interference_edges", len(added))
     return graph
 
 def compute_reaching_defs(cfg: CFG):
@@ -405,26 +753,20 @@ def compute_reaching_defs(cfg: CFG):
 def min_reg_count(interference_graph: CFG):
     reg_count = 0
     max_block = "N/A"
+    symbols = interference_graph.symbols
     for block in interference_graph.blocks.values():
-        unique_in_vars = 0
-        seen = set()
-        for var in block.in_vars:
-            if get_base(var) not in seen:
-                unique_in_vars += 1
-                seen.add(get_base(var))
-        unique_out_vars = 0
-        seen = set()
-        for var in block.out_vars:
-            if get_base(var) not in seen:
-                unique_out_vars += 1
-                seen.add(get_base(var))
+        # Versions of the same variable count once
+        unique_in_vars = len({symbols.base_of(var) for var in block.in_vars})
+        unique_out_vars = len({symbols.base_of(var) for var in block.out_vars})
         if max(unique_in_vars, unique_out_vars) > reg_count:
             reg_count = max(unique_in_vars, unique_out_vars)
             max_block = block.name()
     return reg_count, max_block
 
 def compute_live_intervals(cfg: CFG):
-    cfg.compute_liveness()
+    # Intervals only need instruction positions, not liveness. Definitions and last
+    # uses are keyed by symbol id.
+    intern = cfg.symbols.intern
     definitions = dict()
     last_use = dict()
     ordered_blocks = list(cfg.blocks.values())
@@ -436,21 +778,31 @@ def compute_live_intervals(cfg: CFG):
     idx = 0
     for block in ordered_blocks:
         for instr in block.instrs:
-            if 'dest' in instr and instr['dest'] not in definitions:
-                definitions[instr['dest']] = idx
+            if 'dest' in instr:
+                dest = intern(instr['dest'])
+                if dest not in definitions:
+                    definitions[dest] = idx
             if 'args' in instr:
                 for arg in instr['args']:
-                    last_use[arg] = idx
+                    last_use[intern(arg)] = idx
             idx += 1
     return definitions, last_use, ordered_blocks
 
 
 class Register:
+    __slots__ = ("var", "start", "end", "_co_live_vars")
+
     def __init__(self, var: str, start: int, end: int):
         self.var = var
         self.start = start
         self.end = end
-        self.co_live_vars = set()
+        self._co_live_vars = None
+
+    @property
+    def co_live_vars(self):
+        if self._co_live_vars is None:
+            self._co_live_vars = set()
+        return self._co_live_vars
     
     def is_free(self):
         return self.var is None
@@ -478,11 +830,21 @@ class Register:
         return self.co_live_vars
 
 class Vertex:
+    # Graph keeps exactly one Vertex per variable name, so these are never copied
+    # for lookups; slots keep each one small
+    __slots__ = ("name", "_co_live_vars", "reg_assignment", "reg_idx")
+
     def __init__(self, name: str):
         self.name = name
-        self.co_live_vars = set()
+        self._co_live_vars = None
         self.reg_assignment = None
         self.reg_idx = -1
+
+    @property
+    def co_live_vars(self):
+        if self._co_live_vars is None:
+            self._co_live_vars = set()
+        return self._co_live_vars
     
     def is_same(self, other):
         return self.name == other.name
@@ -506,6 +868,8 @@ class Vertex:
         return self.reg_idx
 
 class Edge:
+    __slots__ = ("u", "v")
+
     def __init__(self, u: Vertex, v: Vertex):
         self.u = u
         self.v = v
@@ -520,27 +884,127 @@ class Edge:
         return f"Edge(u={self.u.name}, v={self.v.name})"
     
     def __hash__(self):
-        return hash(self.u.name ^ self.v.name)
+        return hash(frozenset((self.u.name, self.v.name)))
     
     def __repr__(self):
         return f"Edge(u={self.u.name}, v={self.v.name})"
 
 class Graph:
-    def __init__(self, vertices: list, edges: list):
-        self.vertices = vertices
-        self.edges = edges
+    # Interference graph whose vertex ids are the symbol ids of its variables, so the
+    # liveness bitvectors, spill costs and moves index it directly. Symbols that are
+    # not vertices leave a None in vertex_objs. Each vertex keeps its full adjacency
+    # set for the lifetime of the graph; removing a vertex only marks it inactive and
+    # adjusts its neighbors' degrees, so it can be restored cheaply.
+    def __init__(self, vertices: list, edges: list, symbols: SymbolTable = None):
+        self.symbols = SymbolTable() if symbols is None else symbols
+        self.vertex_objs = [] # id -> Vertex, or None
+        self.adj = [] # id -> set of neighbor ids
+        self.degrees = [] # id -> number of active neighbors
+        self.active = dict() # Active vertex ids, in insertion order
+        self.n_vertices = 0
+        for vertex in vertices:
+            self.add_vertex(vertex)
+        for edge in edges:
+            self.add_edge(edge.u, edge.v)
+
+    @staticmethod
+    def from_edge_list(names: list, edges: list, symbols: SymbolTable = None):
+        # Rebuilds a graph stored as vertex names in id order (None where a symbol
+        # isn't a vertex) plus (id, id) pairs in the order they were first added.
+        # Replaying the additions in order gives the same adjacency sets, iteration
+        # order included, so allocation is unchanged. Returns None if symbols
+        # numbers the names differently.
+        graph = Graph([], [], symbols)
+        for i, name in enumerate(names):
+            if name is not None and graph.symbols.intern(name) != i:
+                return None
+        for name in names:
+            if name is not None:
+                graph.vertex(name)
+        for i, j in edges:
+            graph.add_edge_ids(i, j)
+        return graph
+
+    def vertex(self, name: str):
+        # The graph's one Vertex for a name, added if it is new
+        i = self.find(name)
+        if i is None:
+            self.add_vertex(Vertex(name))
+            i = self.symbols.ids[name]
+        return self.vertex_objs[i]
+
+    def find(self, name: str):
+        # Id of the vertex for a name, None if it isn't in the graph
+        i = self.symbols.ids.get(name)
+        if i is None or i >= len(self.vertex_objs) or self.vertex_objs[i] is None:
+            return None
+        return i
+
+    def vertex_id(self, vertex: Vertex):
+        return self.symbols.ids[vertex.name]
+
+    def get_vertex(self, name: str):
+        return self.vertex_objs[self.symbols.ids[name]]
+
+    def vertex_ids(self):
+        return [i for i, vertex in enumerate(self.vertex_objs) if vertex is not None]
+
+    @property
+    def vertices(self):
+        return [self.vertex_objs[i] for i in self.active]
+
+    @property
+    def edges(self):
+        edges = []
+        for i in self.active:
+            for j in self.adj[i]:
+                if i < j and j in self.active:
+                    edges.append(Edge(self.vertex_objs[i], self.vertex_objs[j]))
+        return edges
 
     def add_vertex(self, vertex: Vertex):
-        self.vertices.append(vertex)
-    
+        if self.find(vertex.name) is not None:
+            # Adding a known vertex back is a restore
+            self.restore_vertex(vertex)
+            return
+        i = self.symbols.intern(vertex.name)
+        while len(self.vertex_objs) <= i:
+            self.vertex_objs.append(None)
+            self.adj.append(set())
+            self.degrees.append(0)
+        self.vertex_objs[i] = vertex
+        self.active[i] = None
+        self.n_vertices += 1
+
     def add_edge(self, u: Vertex, v: Vertex):
-        self.edges.append(Edge(u, v))
-    
+        for vertex in (u, v):
+            if self.find(vertex.name) is None:
+                self.add_vertex(vertex)
+        return self.add_edge_ids(self.vertex_id(u), self.vertex_id(v))
+
+    def add_edge_ids(self, i: int, j: int):
+        if i == j or j in self.adj[i]:
+            return False
+        self.adj[i].add(j)
+        self.adj[j].add(i)
+        if i in self.active and j in self.active:
+            self.degrees[i] += 1
+            self.degrees[j] += 1
+        return True
+
     def contains_edge(self, u: Vertex, v: Vertex):
-        return Edge(u, v) in self.edges or Edge(v, u) in self.edges
-    
+        i = self.find(u.name)
+        j = self.find(v.name)
+        if i is None or j is None:
+            return False
+        return j in self.adj[i] and i in self.active and j in self.active
+
     def contains_edge_from_edge(self, edge: Edge):
-        return edge in self.edges
+        return self.contains_edge(edge.u, edge.v)
+
+    def contains_vertex(self, vertex: Vertex):
+        i = self.find(vertex.name)
+        return i is not None and i in self.active
 
     def __str__(self):
         string = ""
@@ -552,35 +1016,74 @@ class Graph:
             string += f"Edge: {edge.u.name} -> {edge.v.name}"
             string += "\n"
         return string
-    
+
+    def neighbors(self, vertex: Vertex):
+        i = self.vertex_id(vertex)
+        return [self.vertex_objs[j] for j in self.adj[i] if j in self.active]
+
+    def degree(self, vertex: Vertex):
+        return self.degrees[self.vertex_id(vertex)]
+
     def edges_from_vertex(self, vertex: Vertex):
-        edges = []
-        for edge in self.edges:
-            if edge.u.is_same(vertex) or edge.v.is_same(vertex):
-                edges.append(edge)
-        return edges
+        vertex = self.get_vertex(vertex.name)
+        return [Edge(vertex, neighbor) for neighbor in self.neighbors(vertex)]
 
     def contains_vertex_with_less_than_k_edges(self, k: int):
-        for vertex in self.vertices:
-            if len(self.edges_from_vertex(vertex)) < k:
-                return vertex
+        for i in self.active:
+            if self.degrees[i] < k:
+                return self.vertex_objs[i]
         return None
 
     def remove_vertex(self, vertex: Vertex):
-        self.vertices.remove(vertex)
-        edges_to_remove = []
-        for edge in self.edges:
-            if edge.u.is_same(vertex) or edge.v.is_same(vertex):
-                edges_to_remove.append(edge)
-        for edge in edges_to_remove:
-            self.edges.remove(edge)
-        return edges_to_remove
+        edges_removed = self.edges_from_vertex(vertex)
+        self.remove_vertex_id(self.vertex_id(vertex))
+        return edges_removed
+
+    def remove_vertex_id(self, i: int):
+        del self.active[i]
+        for j in self.adj[i]:
+            if j in self.active:
+                self.degrees[j] -= 1
+        self.degrees[i] = 0
+
+    def restore_all(self):
+        # Every vertex back at once, in id order
+        self.active = dict.fromkeys(self.vertex_ids())
+        self.degrees[:] = [len(neighbors) for neighbors in self.adj]
+
+    def restore_vertex(self, vertex: Vertex):
+        self.restore_vertex_id(self.vertex_id(vertex))
+
+    def restore_vertex_id(self, i: int):
+        if i in self.active:
+            return
+        self.active[i] = None
+        degree = 0
+        for j in self.adj[i]:
+            if j in self.active:
+                self.degrees[j] += 1
+                degree += 1
+        self.degrees[i] = degree
 
     def remove_edge(self, edge: Edge):
-        self.edges.remove(edge)
+        i = self.vertex_id(edge.u)
+        j = self.vertex_id(edge.v)
+        if j not in self.adj[i]:
+            raise ValueError(f"{edge} is not in the graph")
+        self.adj[i].discard(j)
+        self.adj[j].discard(i)
+        if i in self.active and j in self.active:
+            self.degrees[i] -= 1
+            self.degrees[j] -= 1
 
     def is_empty(self):
-        return len(self.vertices) == 0 and len(self.edges) == 0
+        return len(self.active) == 0
+
+    def vertex_count(self):
+        return self.n_vertices
+
+    def edge_count(self):
+        return sum(len(neighbors) for neighbors in self.adj) // 2
     
     def make_graph_mermaid(self):
         cfg = "graph TD\n"
@@ -592,183 +1095,787 @@ class Graph:
         return cfg
 
 
-def linear_scan_allocate_registers(cfg: CFG, reg_count: int, fname: str, spill_strategy = "longest_live_range"):
-    # Linear scan register allocation
-    definitions, last_use, ordered_blocks = compute_live_intervals(cfg)
-    start_time = time.time()
-    register_map = dict()
-    free_registers = set()
-    allocated_registers = set()
-    memory_offloaded_vars = set()
-    for i in range(reg_count):
-        register_map[i] = Register(None, -1, -1)
-        free_registers.add(i)
+def build_live_intervals(cfg: CFG, definitions: dict, last_use: dict):
+    # One (start, end, var) interval per variable, with var its symbol id, sorted by
+    # start point. Function arguments are live from the first instruction; variables
+    # that are never used after their definition still occupy a register for that
+    # one instruction.
+    intervals = []
+    if cfg.func_args is not None:
+        for arg in cfg.func_args:
+            var = cfg.symbols.intern(arg['name'])
+            if var not in definitions:
+                intervals.append((0, max(0, last_use.get(var, 0)), var))
+    for var, start in definitions.items():
+        intervals.append((start, max(start, last_use.get(var, start)), var))
+    intervals.sort(key=lambda interval: interval[0])
+    return intervals
+
+class RegisterOccupancy:
+    # Run-length record of which variable held each register over which instructions.
+    # Each stretch is one (reg, start, end) entry with inclusive bounds, stored in flat
+    # arrays, so memory is proportional to the number of intervals rather than to
+    # instructions x registers. Variables are symbol ids; symbols turns them back
+    # into names for the table.
+    def __init__(self, reg_count: int, n_instrs: int, symbols: SymbolTable):
+        self.reg_count = reg_count
+        self.n_instrs = n_instrs
+        self.symbols = symbols
+        self.vars = array.array('i')
+        self.regs = array.array('i')
+        self.starts = array.array('i')
+        self.ends = array.array('i')
+
+    def add_segment(self, var: int, reg: int, start: int, end: int):
+        if end < start:
+            return
+        self.vars.append(var)
+        self.regs.append(reg)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self):
+        return len(self.vars)
+
+    def pressure(self):
+        # Number of registers in use at each instruction, from a difference array
+        delta = [0] * (self.n_instrs + 1)
+        for start, end in zip(self.starts, self.ends):
+            delta[min(start, self.n_instrs)] += 1
+            delta[min(end + 1, self.n_instrs)] -= 1
+        return list(itertools.accumulate(delta[:-1]))
+
+    def max_pressure(self):
+        return max(self.pressure(), default=0)
+
+    def average_pressure(self):
+        if self.n_instrs == 0:
+            return 0.0
+        return sum(self.pressure()) / self.n_instrs
+
+    def pressure_histogram(self):
+        # histogram[p] is the number of instructions with exactly p registers in use
+        histogram = [0] * (self.reg_count + 1)
+        for regs_in_use in self.pressure():
+            histogram[regs_in_use] += 1
+        return histogram
+
+    def register_use_counts(self):
+        # Number of instructions each register spends holding a variable
+        counts = [0] * self.reg_count
+        for reg, start, end in zip(self.regs, self.starts, self.ends):
+            counts[reg] += min(end, self.n_instrs - 1) - start + 1
+        return counts
+
+    def to_instr_wise_reg_map(self):
+        # Per-instruction view of which variable sits in each register, for visualization
+        occupancy = [[None] * self.reg_count for _ in range(self.n_instrs)]
+        for var, reg, start, end in zip(self.vars, self.regs, self.starts, self.ends):
+            for idx in range(start, min(end + 1, self.n_instrs)):
+                occupancy[idx][reg] = var
+        instr_wise_reg_map = []
+        for row in occupancy:
+            instr_wise_reg_map.append([f"{reg}: {self.symbols.name(var)}" if var is not None else f"{reg}:  " for reg, var in enumerate(row)])
+        return instr_wise_reg_map
+
+    def print_table(self):
+        for row in self.to_instr_wise_reg_map():
+            string = ""
+            for cell in row:
+                if len(cell) > 6:
+                    string += cell + "\t"
+                else:
+                    string += cell + "\t\t"
+            print(string)
+        print()
+
+class FunctionAnalysis:
+    # Everything the allocators need that doesn't depend on the register count:
+    # live intervals, the interference graph and spill costs. Each part is computed
+    # on first use and then shared, so one function can be allocated at many
+    # register counts, by both allocators, without redoing liveness.
+    def __init__(self, cfg: CFG):
+        self.cfg = cfg
+        self._liveness = None
+        self._intervals = None
+        self._graph = None
+        self._spill_costs = None
+        self._moves = None
+        self._max_live = None
+        self._max_degree = None
+
+    def compute_intervals(self):
+        self.definitions, self.last_use, ordered_blocks = compute_live_intervals(self.cfg)
+        self.n_instrs = sum(len(block.instrs) for block in ordered_blocks)
+        self._intervals = build_live_intervals(self.cfg, self.definitions, self.last_use)
+
+    @property
+    def liveness(self):
+        # (live in, live out) bitvectors per block, the one liveness computation every
+        # consumer of this analysis shares
+        if self._liveness is None:
+            self.cfg.compute_liveness()
+            self._liveness = (self.cfg.live_in_bits, self.cfg.live_out_bits)
+        return self._liveness
+
+    @property
+    def intervals(self):
+        if self._intervals is None:
+            self.compute_intervals()
+        return self._intervals
 
-    instr_wise_reg_map = []
+    @property
+    def graph(self):
+        if self._graph is None:
+            self._graph = build_interference_graph(self.cfg, self.liveness)
+        return self._graph
+
+    @property
+    def spill_costs(self):
+        if self._spill_costs is None:
+            self._spill_costs = compute_spill_costs(self.cfg)
+        return self._spill_costs
+
+    @property
+    def moves(self):
+        if self._moves is None:
+            self._moves = find_moves(self.cfg)
+        return self._moves
+
+    @property
+    def max_live(self):
+        # Most intervals that overlap at any one instruction. Linear scan never
+        # spills with at least this many registers.
+        if self._max_live is None:
+            ends = []
+            self._max_live = 0
+            for start, end, _ in self.intervals:
+                while len(ends) > 0 and ends[0] < start:
+                    heapq.heappop(ends)
+                heapq.heappush(ends, end)
+                self._max_live = max(self._max_live, len(ends))
+        return self._max_live
+
+    @property
+    def max_degree(self):
+        # With more registers than this, every vertex is trivially colorable
+        if self._max_degree is None:
+            self._max_degree = max((len(adj) for adj in self.graph.adj), default=0)
+        return self._max_degree
+
+@instrument.timed("linear_scan")
+def linear_scan(analysis: FunctionAnalysis, reg_count: int, spill_strategy = "spill_weight"):
+    # Linear scan register allocation (Poletto and Sarkar). Intervals are visited once
+    # in order of their start point. The active intervals are kept in a min-heap on
+    # their end point, so expiring is a heap pop, and in a max-heap on the same key
+    # to find the longest one. Free registers are a min-heap as well, so the lowest
+    # numbered register is always handed out first.
+    #
+    # When a spill is needed, "spill_weight" spills whichever of the active intervals
+    # and the new one has the lowest spill cost per instruction it still has to live,
+    # so values used in loops stay in registers; "longest_live_range" spills the one
+    # that ends last, and anything else evicts a random register.
+    intervals = analysis.intervals
+    spill_costs = analysis.spill_costs if spill_strategy == "spill_weight" else None
+    interval_end = dict()
+    last_use = analysis.last_use
+    free_registers = list(range(reg_count))
+    heapq.heapify(free_registers)
+    active_by_end = []
+    active_by_furthest_end = []
+    register_owner = [None] * reg_count # The variable in each register, None if free
     var_to_reg_map = dict()
+    segment_start = dict()
+    occupancy = RegisterOccupancy(reg_count, analysis.n_instrs, analysis.cfg.symbols)
+    memory_offloaded_vars = set()
 
-    current_instr = 0
-    
-    if cfg.func_args is not None:
-        for arg in cfg.func_args:
-            instr_wise_reg_map_inner = [str(i) for i in range(reg_count)]
-            reg = free_registers.pop()
-            var_to_reg_map[arg['name']] = reg
-            register_map[reg].allocate(arg['name'], 0, last_use[arg['name']])
-            allocated_registers.add(reg)
-            for reg in allocated_registers:
-                instr_wise_reg_map_inner[reg] += ": " + str(register_map[reg].var)
-                var_to_reg_map[register_map[reg].var] = reg
-            for reg in free_registers:
-                instr_wise_reg_map_inner[reg] += ":  "
+    def release(var, reg, end):
+        register_owner[reg] = None
+        occupancy.add_segment(var, reg, segment_start.pop(var), end)
 
-    for block in ordered_blocks:
-        for instr in block.instrs:
-            instr_wise_reg_map_inner = [str(i) for i in range(reg_count)]
-            if 'dest' in instr:
-                var = instr['dest']
-                end = -1
-                if var in var_to_reg_map:
+    def spill_weight(var, position):
+        # Ties go to the interval that ends last, as with longest_live_range
+        remaining = interval_end[var] - position + 1
+        return (spill_costs[var] / remaining, -interval_end[var])
+
+    for start, end, var in intervals:
+        # Expire every interval that ended before this one starts. Entries for
+        # variables that were spilled in the meantime are stale and skipped.
+        while len(active_by_end) > 0 and active_by_end[0][0] < start:
+            old_end, _, old_var, reg = heapq.heappop(active_by_end)
+            if register_owner[reg] == old_var:
+                release(old_var, reg, old_end)
+                heapq.heappush(free_registers, reg)
+        if len(free_registers) > 0:
+            reg = heapq.heappop(free_registers)
+        else:
+            # Spill
+            if reg_count == 0:
+                memory_offloaded_vars.add(var)
+                continue
+            if spill_strategy == "spill_weight":
+                interval_end[var] = end
+                victim = var
+                for owner in register_owner:
+                    if spill_weight(owner, start) < spill_weight(victim, start):
+                        victim = owner
+                if victim == var:
+                    memory_offloaded_vars.add(var)
                     continue
-                if var in last_use:
-                    end = last_use[var]
-                if len(free_registers) == 0:
-                    # Spill 
-                    if spill_strategy == "longest_live_range":
-                        last_free = -1
-                        for reg in allocated_registers:
-                            if register_map[reg].when_free() > last_free:
-                                last_free = register_map[reg].when_free()
-                                spill_reg = reg
-                    else:
-                        spill_reg = random.randint(0, reg_count - 1)
-                    reg_old = register_map[spill_reg]
-                    register_map[spill_reg].free()
-                    memory_offloaded_vars.add(reg_old.var)
-                    register_map[spill_reg].allocate(var, current_instr, end)
-                else:   
-                    regs_list = list(free_registers)
-                    regs_list.sort()
-                    reg_idx = regs_list[0]
-                    free_registers.remove(reg_idx)
-                    allocated_registers.add(reg_idx)
-                    register_map[reg_idx].allocate(var, current_instr, end)
-            for reg in copy.deepcopy(allocated_registers):
-                if register_map[reg].when_free() == current_instr:
-                    free_registers.add(reg)
-                    allocated_registers.remove(reg)
-                    register_map[reg].free()
-            for reg in allocated_registers:
-                instr_wise_reg_map_inner[reg] += ": " + str(register_map[reg].var)
-                var_to_reg_map[register_map[reg].var] = reg
-            for reg in free_registers:
-                instr_wise_reg_map_inner[reg] += ":  "
-            instr_wise_reg_map.append(instr_wise_reg_map_inner)
-            current_instr += 1
-    end_time = time.time()
+                reg = var_to_reg_map[victim]
+            elif spill_strategy == "longest_live_range":
+                while True:
+                    neg_end, _, victim, reg = active_by_furthest_end[0]
+                    if register_owner[reg] == victim:
+                        break
+                    heapq.heappop(active_by_furthest_end)
+                if -neg_end <= end:
+                    # The new interval lives longest, so it is the one to spill
+                    memory_offloaded_vars.add(var)
+                    continue
+                heapq.heappop(active_by_furthest_end)
+            else:
+                reg = random.randint(0, reg_count - 1)
+                victim = register_owner[reg]
+            release(victim, reg, start - 1)
+            del var_to_reg_map[victim]
+            memory_offloaded_vars.add(victim)
+        register_owner[reg] = var
+        var_to_reg_map[var] = reg
+        segment_start[var] = start
+        interval_end[var] = end
+        heapq.heappush(active_by_end, (end, start, var, reg))
+        heapq.heappush(active_by_furthest_end, (-end, -start, var, reg))
+    for reg, var in enumerate(register_owner):
+        if var is not None:
+            end = last_use.get(var, segment_start[var])
+            release(var, reg, max(end, segment_start[var]))
+    instrument.count("linear_scan_spills", len(memory_offloaded_vars))
+    return occupancy, var_to_reg_map, memory_offloaded_vars
+
+def linear_scan_allocate_registers(cfg: CFG, reg_count: int, fname: str, spill_strategy = "spill_weight", visualize = False, analysis = None):
+    if analysis is None:
+        analysis = FunctionAnalysis(cfg)
+    # Liveness and the intervals belong to the analysis, so they are left out of the timing
+    analysis.intervals
+    start_time = time.perf_counter()
+    occupancy, var_to_reg_map, memory_offloaded_vars = linear_scan(analysis, reg_count, spill_strategy)
+    end_time = time.perf_counter()
     print(fname, reg_count, " Linear Scan Time Taken: ", end_time - start_time)
     print(fname, reg_count, " Linear Scan Number of spills: ", len(memory_offloaded_vars))
-    
-    # This is for visualizing the register allocation
-    # for row in instr_wise_reg_map:
-    #     string = ""
-    #     for cell in row:
-    #         if len(cell) > 6:
-    #             string += cell + "\t"
-    #         else:
-    #             string += cell + "\t\t"
-    #     print(string)
-    # print()
-
-    max_regs_in_use = 0
-    for instr in instr_wise_reg_map:
-        regs_in_use = 0
-        for elem in instr:
-            elem_clone = elem.strip()
-            elem_clone =elem_clone.split(':')
-            if elem_clone[1] != "":
-                regs_in_use += 1
-        if regs_in_use > max_regs_in_use:
-            max_regs_in_use = regs_in_use
-    print(fname, reg_count, " Linear Scan Maximum number of registers in use: ", max_regs_in_use)
-    return instr_wise_reg_map, var_to_reg_map
-
-def graph_coloring_allocate_registers(cfg: CFG, reg_count: int, fname: str):
-    k = reg_count
-    graph = build_interference_graph(cfg)
-
-    start_time = time.time()
-    S = set()
-    G = copy.deepcopy(graph)
-    stack = [] # Working Stack
-    registers = [i for i in range(reg_count)]
-    reg_alloc = dict()
-    for v in G.vertices:
-        reg_alloc[v.name] = None
+    print(fname, reg_count, " Linear Scan Estimated spill cost: ", estimate_spill_cost(analysis.spill_costs, memory_offloaded_vars))
+    print(fname, reg_count, " Linear Scan Maximum number of registers in use: ", occupancy.max_pressure())
+
+    # The per-instruction table is only rendered when someone wants to look at it
+    if visualize:
+        occupancy.print_table()
+    return occupancy, var_to_reg_map, memory_offloaded_vars
+
+def compute_spill_costs(cfg: CFG):
+    # Every use or definition of a variable would become a load or store if it were
+    # spilled, and one inside a loop runs LOOP_WEIGHT times as often per level of nesting.
+    # Returns the costs as a list indexed by symbol id; every name in the function was
+    # interned when its blocks were formed, so the list covers all of them.
+    weights = loops.block_weights(cfg)
+    ids = cfg.symbols.ids
+    spill_costs = [0] * len(cfg.symbols)
+    for block_name, block in cfg.blocks.items():
+        weight = weights[block_name]
+        for instr in block.instrs:
+            if 'dest' in instr:
+                spill_costs[ids[instr['dest']]] += weight
+            if 'args' in instr:
+                for arg in instr['args']:
+                    spill_costs[ids[arg]] += weight
+    return spill_costs
 
+def find_moves(cfg: CFG):
+    # (dest, src) symbol ids of every id between two different variables, in block
+    # order. These are the copies coalescing tries to remove; the interference graph
+    # leaves out the edge an id would otherwise add between the two.
+    ids = cfg.symbols.ids
+    moves = []
+    for block in cfg.blocks.values():
+        for instr in block.instrs:
+            if instr.get('op') == 'id' and instr['dest'] != instr['args'][0]:
+                moves.append((ids[instr['dest']], ids[instr['args'][0]]))
+    return moves
+
+def estimate_spill_cost(spill_costs: list, spilled):
+    # Static estimate of the loads and stores spilling adds, weighted by loop depth.
+    # spilled holds symbol ids.
+    return sum(spill_costs[i] for i in spilled)
+
+@instrument.timed("simplify")
+def simplify_graph(G: Graph, k: int, spill_costs: list):
+    # Chaitin-Briggs simplify: vertices with fewer than k neighbors go on a low-degree
+    # worklist, the rest are significant. Removing a vertex decrements its neighbors'
+    # degrees, moving them to the low worklist as soon as they drop below k. When only
+    # significant vertices remain, the one with the lowest spill cost over degree
+    # squared (Bernstein et al.) is removed as a (potential) spill.
+    low_worklist = collections.deque()
+    significant = set()
+    spill_heap = []
+    degrees = G.degrees
+
+    def spill_priority(i):
+        degree = degrees[i]
+        return (spill_costs[i] / (max(degree, 1) ** 2), i, degree)
+
+    # Visit vertices in id order rather than active order, which select leaves
+    # reversed, so a graph reused across register counts simplifies the same way
+    for i in range(len(G.vertex_objs)):
+        if i not in G.active:
+            continue
+        if G.degrees[i] < k:
+            low_worklist.append(i)
+        else:
+            significant.add(i)
+            heapq.heappush(spill_heap, spill_priority(i))
+
+    stack = []
     while not G.is_empty():
-        v = G.contains_vertex_with_less_than_k_edges(k)
-        color = True
-        if v is None:
-            v = G.vertices[0]
+        if len(low_worklist) > 0:
+            i = low_worklist.popleft()
+            color = True
+        else:
+            # Entries are only brought up to date when they reach the top. Removing a
+            # neighbor only raises a vertex's priority, so a stale entry is never
+            # above the vertex's real one and the first current entry is the minimum.
+            entry = heapq.heappop(spill_heap)
+            i = entry[1]
+            if i not in significant:
+                continue
+            if entry[2] != degrees[i]:
+                heapq.heappush(spill_heap, spill_priority(i))
+                continue
+            significant.remove(i)
             color = False
-        stack_line = (v, G.edges_from_vertex(v), color)
-        stack.append(stack_line)
-        G.remove_vertex(v)
-    old_stack = copy.deepcopy(stack)
-    
-    S_old = copy.deepcopy(S)
-    while True: 
-        stack = copy.deepcopy(old_stack)
-        while len(stack) > 0:
-            v, edges, color = stack.pop()
-            if color:
-                for edge in edges:
-                    G.add_edge(edge.u, edge.v)
-                neighbor_regs = []
-                for edge in edges:
-                    if not v.is_same(edge.v) and reg_alloc[edge.v.name] is not None:
-                        neighbor_regs.append(reg_alloc[edge.v.name])
-                    if not v.is_same(edge.u) and reg_alloc[edge.u.name] is not None:
-                        neighbor_regs.append(reg_alloc[edge.u.name])
+        stack.append((i, color))
+        G.remove_vertex_id(i)
+        for j in G.adj[i]:
+            if j in significant and degrees[j] < k:
+                significant.remove(j)
+                low_worklist.append(j)
+    return stack
+
+def color_graph(G: Graph, k: int, spill_costs: list):
+    # Simplify and select on G, which is left with every vertex restored. Returns the
+    # allocation as vertex id -> register (None if spilled), the spilled ids and the
+    # (id, reg) of each potential spill that was colored optimistically.
+    S = set()
+    optimistic = []
+    regs = [None] * len(G.vertex_objs) # id -> register
+
+    # Simplify empties the graph and returns the order vertices were removed in.
+    # That order doubles as the undo log: select walks it backwards, so no copy of
+    # the graph or the stack is ever needed.
+    stack = simplify_graph(G, k, spill_costs)
+    elim_index = [0] * len(G.vertex_objs)
+    for idx, (i, _) in enumerate(stack):
+        elim_index[i] = idx
+
+    with instrument.phase("select"):
+        for i, color in reversed(stack):
+            # The neighbors that matter are the ones removed after this vertex,
+            # i.e. the ones select has already visited
+            idx = elim_index[i]
+            neighbor_regs = set()
+            allocated_neighbors = 0
+            for j in G.adj[i]:
+                if elim_index[j] > idx and regs[j] is not None:
+                    neighbor_regs.add(regs[j])
+                    allocated_neighbors += 1
+            # Color is false for potential spills, which are colored optimistically
+            if color or allocated_neighbors < k:
                 # Use the first available register
-                for reg in registers:
+                for reg in range(k):
                     if reg not in neighbor_regs:
-                        reg_alloc[v.name] = reg
-                        v.set_reg_idx(reg)
-                        G.add_vertex(v)
+                        regs[i] = reg
+                        G.vertex_objs[i].set_reg_idx(reg)
+                        if not color:
+                            optimistic.append((i, reg))
                         break
-            else: # Color is false, indicates a spill
-                allocated_neighbors = 0
-                neighbor_regs = []
-                for edge in edges: # Optimistically color
-                    if not v.is_same(edge.u) and reg_alloc[edge.u.name] is not None:
-                        neighbor_regs.append(reg_alloc[edge.u.name])
-                        allocated_neighbors += 1
-                    elif not v.is_same(edge.v) and reg_alloc[edge.v.name] is not None:
-                        neighbor_regs.append(reg_alloc[edge.v.name])
-                        allocated_neighbors += 1
-                if allocated_neighbors < k:
-                    # Allocate a register anyway
-                    for edge in edges:
-                        G.add_edge(edge.u, edge.v)
-                    for reg in registers:
-                        if reg not in neighbor_regs:
-                            reg_alloc[v.name] = reg
-                            v.set_reg_idx(reg)
-                            print(v.name, reg)
-                            G.add_vertex(v)
-                            break
+            else:
+                # Spill
+                S.add(i)
+        G.restore_all()
+    reg_alloc = {i: regs[i] for i in G.vertex_ids()}
+    return reg_alloc, S, optimistic
+
+# Move states for coalesce_graph. A move waits on the worklist until coalescing is
+# tried, stays active while neither test passes, and ends up coalesced, constrained
+# (its two variables interfere) or frozen (given up so one of them can be simplified)
+MOVE_WORKLIST, MOVE_ACTIVE, MOVE_COALESCED, MOVE_CONSTRAINED, MOVE_FROZEN = range(5)
+
+@instrument.timed("coalesce")
+def coalesce_graph(G: Graph, k: int, spill_costs: list, moves: list):
+    """
+    Iterated register coalescing (George and Appel, 1996). Simplify, conservative
+    coalescing of moves, freezing and potential spills are interleaved on worklists:
+    vertices in a move are held back from simplify until their moves are coalesced
+    or frozen, and two vertices are only merged when the Briggs test (fewer than k
+    significant neighbors between them) or the George test (every neighbor of one
+    is insignificant or already a neighbor of the other) shows the merged vertex
+    can still be colored. G itself is not changed; merging copies the adjacency
+    sets it adds to.
+
+    Args:
+        G: Interference graph
+        k: Number of registers
+        spill_costs: Spill cost of each symbol id, see compute_spill_costs
+        moves: (dest, src) id pairs of the copies to coalesce, see find_moves
+
+    Returns:
+        (stack, alias, coalesced): the order vertices were removed in as (id, color)
+        pairs like simplify_graph, with color False for potential spills; for every
+        vertex id, the id of the vertex it was merged into (itself if it wasn't);
+        and the (dest, src) moves that were coalesced
+    """
+    n = len(G.vertex_objs)
+    adj = list(G.adj) # Shares G's sets until add_edge copies one
+    copied = set()
+    degrees = [len(neighbors) for neighbors in adj]
+    alias = list(range(n))
+    coalesced_nodes = set()
+    removed = [False] * n # On the stack or coalesced, so out of the graph
+    stack = []
+
+    vertex_objs = G.vertex_objs
+    move_pairs = []
+    for dest, src in moves:
+        if max(dest, src) < n and vertex_objs[dest] is not None and vertex_objs[src] is not None:
+            move_pairs.append((dest, src))
+    move_list = dict() # Vertex -> the moves it is in, for vertices in any
+    for m, (x, y) in enumerate(move_pairs):
+        move_list.setdefault(x, []).append(m)
+        move_list.setdefault(y, []).append(m)
+    state = [MOVE_WORKLIST] * len(move_pairs)
+    significant_neighbors = dict() # Vertex -> a superset of its significant neighbors, see live_significant
+    active_moves = dict() # Vertex -> its moves that went active, in the order they did
+    worklist_moves = collections.deque(range(len(move_pairs)))
+
+    simplify_worklist = collections.deque()
+    freeze_worklist = dict() # Ordered set of insignificant vertices that are in moves
+    spill_worklist = set()
+    spill_heap = []
+    potential_spills = set()
+    # Spilling a merged vertex spills every variable in it, so it costs all of theirs
+    costs = list(spill_costs[:n])
+
+    def spill_priority(i):
+        return (costs[i] / (max(degrees[i], 1) ** 2), i, degrees[i])
+
+    def add_spill(i):
+        spill_worklist.add(i)
+        heapq.heappush(spill_heap, spill_priority(i))
+
+    def get_alias(i):
+        while i in coalesced_nodes:
+            i = alias[i]
+        return i
+
+    def adjacent(i):
+        return [j for j in adj[i] if not removed[j]]
+
+    # A move that is coalesced, constrained or frozen stays that way, so those are
+    # dropped from the move lists as they are found. Otherwise the long-lived
+    # variables, which are in a move in almost every block, would be rescanned each time.
+    def node_moves(i):
+        moves = move_list.get(i)
+        if not moves:
+            return []
+        moves[:] = [m for m in moves if state[m] <= MOVE_ACTIVE]
+        return moves
+
+    def move_related(i):
+        moves = move_list.get(i)
+        while moves and state[moves[-1]] > MOVE_ACTIVE:
+            moves.pop()
+        return bool(moves)
+
+    def enable_moves(nodes):
+        # Only moves that went active can need enabling, so each vertex keeps those
+        # apart from the rest of its moves
+        for i in nodes:
+            for m in active_moves.pop(i, ()):
+                if state[m] == MOVE_ACTIVE:
+                    state[m] = MOVE_WORKLIST
+                    worklist_moves.append(m)
+
+    def decrement_degree(i):
+        degrees[i] -= 1
+        if i not in spill_worklist:
+            return
+        if degrees[i] < k:
+            # Dropping below k may let moves of i and its neighbors pass the tests
+            enable_moves([i] + adjacent(i))
+            spill_worklist.remove(i)
+            if move_related(i):
+                freeze_worklist[i] = None
+            else:
+                simplify_worklist.append(i)
+
+    def add_edge(i, j):
+        if i != j and j not in adj[i]:
+            for x, y in ((i, j), (j, i)):
+                if x not in copied:
+                    adj[x] = set(adj[x])
+                    copied.add(x)
+                adj[x].add(y)
+            for x, y in ((i, j), (j, i)):
+                degrees[x] += 1
+                if degrees[x] == k:
+                    add_significant(x)
+                elif degrees[x] > k and y in significant_neighbors:
+                    significant_neighbors[y].add(x)
+                if x in spill_worklist:
+                    heapq.heappush(spill_heap, spill_priority(x))
+
+    def add_significant(i):
+        for j in adj[i]:
+            if j in significant_neighbors:
+                significant_neighbors[j].add(i)
+
+    def live_significant(i):
+        # The significant neighbors of i that are still in the graph. The set is
+        # built the first time a move of i is tested and then kept up to date by
+        # add_edge; vertices are only dropped from it here, once they turn out to be
+        # removed or insignificant, so each stale entry costs one extra step.
+        neighbors = significant_neighbors.get(i)
+        if neighbors is None:
+            neighbors = {t for t in adj[i] if degrees[t] >= k}
+            significant_neighbors[i] = neighbors
+        stale = []
+        try:
+            for t in neighbors:
+                if removed[t] or degrees[t] < k:
+                    stale.append(t)
                 else:
-                    # Spill
-                    reg_alloc[v.name] = None
-                    S.add(v)
-        if S == S_old:
-            break
-        S_old = copy.deepcopy(S)
-    end_time = time.time()
+                    yield t
+        finally:
+            neighbors.difference_update(stale)
+
+    def add_work_list(i):
+        # A vertex whose last move was settled can be simplified
+        if i in freeze_worklist and degrees[i] < k and not move_related(i):
+            del freeze_worklist[i]
+            simplify_worklist.append(i)
+
+    # Only significant neighbors matter to either test, and the long-lived variables
+    # in a move can have thousands of neighbors, so both go through
+    # significant_neighbors rather than the adjacency sets
+    def briggs(u, v):
+        # Counts the significant neighbors of u and v together, stopping at k
+        significant = 0
+        for t in live_significant(u):
+            significant += 1
+            if significant >= k:
+                return False
+        adj_u = adj[u]
+        for t in live_significant(v):
+            if t not in adj_u:
+                significant += 1
+                if significant >= k:
+                    return False
+        return True
+
+    def george(u, v):
+        # Merging v into u is safe if every neighbor of v is either insignificant or
+        # a neighbor of u already
+        return all(u in adj[t] for t in live_significant(v))
+
+    def combine(u, v):
+        if v in freeze_worklist:
+            del freeze_worklist[v]
+        else:
+            spill_worklist.discard(v)
+        coalesced_nodes.add(v)
+        removed[v] = True
+        alias[v] = u
+        costs[u] += costs[v]
+        move_list[u] = move_list.get(u, []) + move_list.get(v, [])
+        enable_moves([v])
+        for t in adjacent(v):
+            add_edge(t, u)
+            decrement_degree(t)
+        if degrees[u] >= k and u in freeze_worklist:
+            del freeze_worklist[u]
+            add_spill(u)
+
+    def coalesce():
+        m = worklist_moves.popleft()
+        if state[m] != MOVE_WORKLIST:
+            return # Frozen while it waited
+        u, v = get_alias(move_pairs[m][0]), get_alias(move_pairs[m][1])
+        if u == v:
+            state[m] = MOVE_COALESCED
+            add_work_list(u)
+        elif v in adj[u]:
+            state[m] = MOVE_CONSTRAINED
+            add_work_list(u)
+            add_work_list(v)
+        elif briggs(u, v) or george(u, v) or george(v, u):
+            if not briggs(u, v) and not george(u, v):
+                u, v = v, u
+            state[m] = MOVE_COALESCED
+            combine(u, v)
+            add_work_list(u)
+        else:
+            state[m] = MOVE_ACTIVE
+            active_moves.setdefault(u, dict())[m] = None
+            active_moves.setdefault(v, dict())[m] = None
+
+    def freeze_moves(u):
+        # Gives up on coalescing u's moves, so u and maybe its partners can be simplified
+        for m in list(node_moves(u)):
+            x, y = move_pairs[m]
+            v = get_alias(x) if get_alias(y) == get_alias(u) else get_alias(y)
+            state[m] = MOVE_FROZEN
+            if v in freeze_worklist and degrees[v] < k and not move_related(v):
+                del freeze_worklist[v]
+                simplify_worklist.append(v)
+
+    def simplify():
+        i = simplify_worklist.popleft()
+        if removed[i]:
+            return
+        stack.append((i, i not in potential_spills))
+        removed[i] = True
+        for j in adj[i]:
+            if removed[j]:
+                continue
+            if j in spill_worklist:
+                decrement_degree(j)
+            else:
+                degrees[j] -= 1
+
+    def select_spill():
+        # Lowest spill cost over degree squared, as in simplify_graph. Entries are
+        # pushed again when a degree or cost goes up, which lowers the priority; on
+        # the way down they are brought up to date lazily, when they reach the top.
+        while True:
+            entry = heapq.heappop(spill_heap)
+            i = entry[1]
+            if i not in spill_worklist:
+                continue
+            current = spill_priority(i)
+            if entry == current:
+                break
+            heapq.heappush(spill_heap, current)
+        spill_worklist.remove(i)
+        potential_spills.add(i)
+        simplify_worklist.append(i)
+        freeze_moves(i)
+
+    for i in G.vertex_ids():
+        if degrees[i] >= k:
+            add_spill(i)
+        elif move_related(i):
+            freeze_worklist[i] = None
+        else:
+            simplify_worklist.append(i)
+
+    while len(simplify_worklist) > 0 or len(worklist_moves) > 0 or len(freeze_worklist) > 0 or len(spill_worklist) > 0:
+        if len(simplify_worklist) > 0:
+            simplify()
+        elif len(worklist_moves) > 0:
+            coalesce()
+        elif len(freeze_worklist) > 0:
+            # The most recently added is as good as any
+            u, _ = freeze_worklist.popitem()
+            simplify_worklist.append(u)
+            freeze_moves(u)
+        else:
+            select_spill()
+
+    for i in coalesced_nodes:
+        alias[i] = get_alias(i)
+    coalesced = [move_pairs[m] for m in range(len(move_pairs)) if state[m] == MOVE_COALESCED]
+    return stack, alias, coalesced
+
+def color_coalesced_graph(G: Graph, k: int, spill_costs: list, moves: list):
+    # Select after coalesce_graph. The variables merged into a vertex all get its
+    # register; if it can't get one, the merge is undone and they are colored one at
+    # a time, so a coalesced vertex that is too constrained doesn't spill variables
+    # that could have had registers on their own. Returns what coalesce_color_graph
+    # does.
+    stack, alias, coalesced = coalesce_graph(G, k, spill_costs, moves)
+    members = dict() # Merged vertex -> the variables in it, for the ones with more than one
+    for i, root in enumerate(alias):
+        if root != i:
+            members.setdefault(root, [root]).append(i)
+    colors = [None] * len(G.vertex_objs)
+    S = set()
+    optimistic = []
+    reg_alloc = dict()
+
+    def free_reg(group):
+        # Neighbors that haven't been colored yet show up as None
+        neighbor_regs = {colors[j] for i in group for j in G.adj[i]}
+        for reg in range(k):
+            if reg not in neighbor_regs:
+                return reg
+        return None
+
+    with instrument.phase("select"):
+        for i, color in reversed(stack):
+            group = members.get(i, (i,))
+            reg = free_reg(group)
+            if reg is not None:
+                for m in group:
+                    colors[m] = reg
+                    if not color:
+                        optimistic.append((m, reg))
+                continue
+            # The most expensive variables get the first pick of what is left
+            for m in sorted(group, key=lambda m: -spill_costs[m]):
+                colors[m] = free_reg([m])
+                if colors[m] is not None and not color:
+                    optimistic.append((m, colors[m]))
+        for i in G.vertex_ids():
+            reg_alloc[i] = colors[i]
+            if colors[i] is None:
+                S.add(i)
+    coalesced = [(dest, src) for dest, src in coalesced if reg_alloc[dest] is not None and reg_alloc[dest] == reg_alloc[src]]
+    return reg_alloc, S, optimistic, coalesced
+
+def coalesce_color_graph(G: Graph, k: int, spill_costs: list, moves: list):
+    # Graph coloring with the moves coalesced (see coalesce_graph). The Briggs and
+    # George tests only promise that merging keeps a graph colorable by simplify;
+    # once something has to spill, merging can still change what does. So when the
+    # coalesced allocation spills, color_graph is run as well and the merges are
+    # only kept if they spill no more variables at no more cost. Returns what
+    # color_graph does, plus the coalesced (dest, src) moves whose variables share
+    # a register.
+    reg_alloc, S, optimistic, coalesced = color_coalesced_graph(G, k, spill_costs, moves)
+    if len(S) > 0:
+        plain = color_graph(G, k, spill_costs)
+        if len(plain[1]) < len(S) or estimate_spill_cost(spill_costs, plain[1]) < estimate_spill_cost(spill_costs, S):
+            reg_alloc, S, optimistic = plain
+            coalesced = []
+            instrument.count("coalescing_fallbacks")
+    for i, reg in reg_alloc.items():
+        if reg is not None:
+            G.vertex_objs[i].set_reg_idx(reg)
+    instrument.count("graph_coloring_spills", len(S))
+    instrument.count("optimistic_colorings", len(optimistic))
+    instrument.count("coalesced_moves", len(coalesced))
+    return reg_alloc, S, optimistic, coalesced
+
+def graph_coloring_allocate_registers(cfg: CFG, reg_count: int, fname: str, analysis = None):
+    if analysis is None:
+        analysis = FunctionAnalysis(cfg)
+    G = analysis.graph
+    spill_costs = analysis.spill_costs
+
+    start_time = time.perf_counter()
+    reg_alloc, S, _, coalesced = coalesce_color_graph(G, reg_count, spill_costs, analysis.moves)
+    end_time = time.perf_counter()
     print(fname, reg_count, " Graph Coloring Time Taken: ", end_time - start_time)
+    print(fname, reg_count, " Graph Coloring Coalesced moves: ", len(coalesced), "of", len(analysis.moves))
     print(fname, reg_count, " Graph Coloring Number of spills: ", len(S))
+    print(fname, reg_count, " Graph Coloring Estimated spill cost: ", estimate_spill_cost(spill_costs, S))
     regs_in_use = set()
     for reg in reg_alloc.values():
         if reg is not None:
@@ -779,22 +1886,152 @@ def graph_coloring_allocate_registers(cfg: CFG, reg_count: int, fname: str):
 
     return reg_alloc, S
 
-def verify_register_allocation(cfg: CFG, reg_alloc: dict, spilled_vars: set):
-    graph = build_interference_graph(cfg)
-    for vertex in graph.vertices:
-        if vertex.name in reg_alloc and reg_alloc[vertex.name] is not None:
-            reg = reg_alloc[vertex.name]
-            for edge in graph.edges_from_vertex(vertex):
-                if edge.u.name != vertex.name:
-                    if reg_alloc[edge.u.name] == reg:
-                        print("A Register conflict at ", vertex.name, " and ", edge.u.name)
-                        return False
-                elif edge.v.name != vertex.name:
-                    if reg_alloc[edge.v.name] == reg:
-                        print("B Register conflict at ", vertex.name, " and ", edge.v.name)
-                        return False
+@instrument.timed("verify")
+def verify_register_allocation(cfg: CFG, reg_alloc: dict, spilled_vars: set, graph = None):
+    if graph is None:
+        graph = build_interference_graph(cfg)
+    # reg_alloc is keyed by vertex id
+    for i in graph.active:
+        reg = reg_alloc.get(i)
+        if reg is None:
+            continue
+        for j in graph.adj[i]:
+            if j in graph.active and reg_alloc.get(j) == reg:
+                print("Register conflict at ", graph.symbols.name(i), " and ", graph.symbols.name(j))
+                return False
     return True
 
+ALLOCATORS = ("linear_scan", "graph_coloring")
+
+def sweep_register_counts(cfg: CFG, reg_counts, allocators = ALLOCATORS, spill_strategy = "spill_weight", analysis = None):
+    """
+    Allocates one function at every register count in reg_counts, sharing a single
+    analysis (liveness, intervals, interference graph, spill costs) across all of them
+
+    Args:
+        cfg: The function's CFG
+        reg_counts: List or range of register counts
+        allocators: Which of ALLOCATORS to run
+        spill_strategy: Linear scan spill strategy
+        analysis: An existing FunctionAnalysis of cfg to reuse
+
+    Returns:
+        List of dicts with allocator, reg_count, spills, spill_cost (see
+        estimate_spill_cost), registers_used, time and reused, in the order of
+        reg_counts. Once k reaches the point where an allocator can no longer
+        spill (the most simultaneously live intervals for linear scan, more than
+        the maximum degree for graph coloring, or one register per variable once
+        there are moves to coalesce), its result no longer depends on k, so it is
+        computed once and reused for every larger k.
+    """
+    if analysis is None:
+        analysis = FunctionAnalysis(cfg)
+    for allocator in allocators:
+        if allocator not in ALLOCATORS:
+            raise ValueError(f"unknown allocator {allocator!r}")
+    rows = []
+    saturated = dict() # Allocator -> the row at the first k that can't spill
+    for k in reg_counts:
+        for allocator in allocators:
+            if allocator in saturated:
+                row = dict(saturated[allocator], reg_count=k, time=0.0, reused=True)
+                rows.append(row)
+                continue
+            start_time = time.perf_counter()
+            if allocator == "linear_scan":
+                occupancy, _, spills = linear_scan(analysis, k, spill_strategy)
+                registers_used = occupancy.max_pressure()
+                stable = k >= analysis.max_live and spill_strategy in ("spill_weight", "longest_live_range")
+            else:
+                reg_alloc, spills, _, coalesced = coalesce_color_graph(analysis.graph, k, analysis.spill_costs, analysis.moves)
+                registers_used = len(set(reg_alloc.values()) - {None})
+                # Merged vertices can have more neighbors than any vertex of the graph,
+                # so with moves the coalescing decisions only stop changing once every
+                # vertex is insignificant however they are merged
+                stable = k >= analysis.graph.vertex_count() if len(analysis.moves) > 0 else k > analysis.max_degree
+            row = {'allocator': allocator, 'reg_count': k, 'spills': len(spills), 'registers_used': registers_used,
+                   'time': time.perf_counter() - start_time, 'reused': False,
+                   'spill_cost': estimate_spill_cost(analysis.spill_costs, spills)}
+            rows.append(row)
+            if stable:
+                saturated[allocator] = row
+    return rows
+
+def print_sweep_table(fname: str, rows: list):
+    print(fname)
+    print(f"{'allocator':<16}{'k':>4}{'spills':>8}{'cost':>8}{'regs':>6}{'time (s)':>12}")
+    for row in rows:
+        time_taken = "reused" if row['reused'] else f"{row['time']:.6f}"
+        print(f"{row['allocator']:<16}{row['reg_count']:>4}{row['spills']:>8}{row['spill_cost']:>8}{row['registers_used']:>6}{time_taken:>12}")
+    print()
+
+def phi_placement_report(cfg: CFG):
+    # Phi count and placement time for each mode on the same CFG
+    rows = []
+    for mode in PHI_MODES:
+        start_time = time.perf_counter()
+        placement = cfg.place_phis(mode)
+        rows.append({'mode': mode, 'phis': sum(len(phi_vars) for phi_vars in placement.values()),
+                     'time': time.perf_counter() - start_time})
+    return rows
+
+def report_phi_placement(program: dict, filename: str):
+    for func in program['functions']:
+        fn_blocks = blocks.form_blocks(func)
+        for block in fn_blocks.values():
+            block.reinitialize_vars()
+        cfg = CFG(fn_blocks, (func['args'] if 'args' in func else None))
+        print(filename.split('-')[0] + "_" + func['name'])
+        print(f"{'mode':<14}{'phis':>6}{'time (s)':>12}")
+        for row in phi_placement_report(cfg):
+            print(f"{row['mode']:<14}{row['phis']:>6}{row['time']:>12.6f}")
+        print()
+
+def interference_report(cfg: CFG):
+    # Edge count, maximum degree and build time of both interference builders on the
+    # same liveness, plus how many registers graph coloring needs with each graph
+    cfg.compute_liveness()
+    rows = []
+    liveness = (cfg.live_in_bits, cfg.live_out_bits)
+    builders = [("block", block_interference_graph), ("precise", lambda cfg: precise_interference_graph(cfg, liveness)[0])]
+    for builder, build in builders:
+        start_time = time.perf_counter()
+        graph = build(cfg)
+        elapsed = time.perf_counter() - start_time
+        colors, _, _ = color_graph(graph, graph.vertex_count() + 1, [0] * len(graph.vertex_objs))
+        rows.append({'builder': builder, 'edges': graph.edge_count(), 'max_degree': max(graph.degrees, default=0),
+                     'registers': len(set(colors.values()) - {None}), 'time': elapsed})
+    return rows
+
+def report_interference(program: dict, filename: str):
+    for func in program['functions']:
+        fn_blocks = blocks.form_blocks(func)
+        for block in fn_blocks.values():
+            block.reinitialize_vars()
+        cfg = CFG(fn_blocks, (func['args'] if 'args' in func else None))
+        print(filename.split('-')[0] + "_" + func['name'])
+        print(f"{'builder':<10}{'edges':>8}{'max degree':>12}{'registers':>11}{'time (s)':>12}")
+        for row in interference_report(cfg):
+            print(f"{row['builder']:<10}{row['edges']:>8}{row['max_degree']:>12}{row['registers']:>11}{row['time']:>12.6f}")
+        print()
+
+def report_loops(program: dict, filename: str):
+    for func in program['functions']:
+        fn_blocks = blocks.form_blocks(func)
+        for block in fn_blocks.values():
+            block.reinitialize_vars()
+        cfg = CFG(fn_blocks, (func['args'] if 'args' in func else None))
+        print(filename.split('-')[0] + "_" + func['name'])
+        print(cfg.loops if len(cfg.loops.loops) > 0 else "no loops")
+        print()
+
+def parse_reg_counts(text: str):
+    # "3:32" is an inclusive range, "10,7,5" a list
+    if ":" in text:
+        low, high = text.split(":")
+        return range(int(low), int(high) + 1)
+    return [int(k) for k in text.split(",")]
+
 class RegisterSpecs:
     def __init__(self, arg_regs: list, ret_regs: list, gp_regs: list, special_regs: list):
         self.arg_regs = arg_regs
@@ -804,78 +2041,215 @@ class RegisterSpecs:
 
 
 def reg_alloc_to_instrs(cfg: CFG, reg_alloc: dict, specs: RegisterSpecs):
+    # The instructions are rewritten in terms of registers, so cached analyses no longer apply
+    cfg.cache_entry = None
+    ids = cfg.symbols.ids
     for block in cfg.blocks.values():
         for instr in block.instrs:
             if 'dest' in instr:
-                if instr['dest'] in reg_alloc:
-                    if reg_alloc[instr['dest']] == None:
+                var = ids.get(instr['dest'])
+                if var in reg_alloc:
+                    if reg_alloc[var] == None:
                         dest_reg = "mr"
                     else:
-                        dest_reg = specs.gp_regs[reg_alloc[instr['dest']]]
+                        dest_reg = specs.gp_regs[reg_alloc[var]]
                     instr['dest'] = dest_reg
             if 'args' in instr:
                 for i in range(len(instr['args'])):
-                    if instr['args'][i] in reg_alloc:
-                        if reg_alloc[instr['args'][i]] == None:
+                    var = ids.get(instr['args'][i])
+                    if var in reg_alloc:
+                        if reg_alloc[var] == None:
                             arg_reg = "mr"
                         else:
-                            arg_reg = specs.gp_regs[reg_alloc[instr['args'][i]]]
+                            arg_reg = specs.gp_regs[reg_alloc[var]]
                         instr['args'][i] = arg_reg
             # TODO: Handle memory loads
     return cfg
 
-if __name__ == '__main__': 
-    import sys
+def count_redundant_moves(moves: list, reg_alloc: dict):
+    # Moves whose source and destination ended up in the same register, whether they
+    # were coalesced or happened to get the same color
+    count = 0
+    for dest, src in moves:
+        reg = reg_alloc.get(dest)
+        if reg is not None and reg == reg_alloc.get(src):
+            count += 1
+    return count
 
-    if len(sys.argv) != 2:
-        print("Usage: python cfg.py <filename>")
-        sys.exit(1)
+def remove_redundant_moves(cfg: CFG):
+    # Drops the ids that copy a register into itself once reg_alloc_to_instrs has
+    # rewritten the instructions; they would otherwise become mv x, x. Spilled
+    # variables all share the "mr" placeholder, so their copies are kept. Returns
+    # the number removed.
+    removed = 0
+    for block in cfg.blocks.values():
+        kept = []
+        for instr in block.instrs:
+            if instr.get('op') == 'id' and instr['dest'] == instr['args'][0] and instr['dest'] != "mr":
+                removed += 1
+            else:
+                kept.append(instr)
+        block.instrs[:] = kept
+    instrument.count("eliminated_moves", removed)
+    return removed
 
-    filename = sys.argv[1]
-    with open(filename, 'r') as file:
-        program = utils.read_json_file(file)
+def allocate_function(func: dict, filename: str, results = None, cache = None, sweep = None, allocators = ALLOCATORS):
+    # Runs the whole pipeline on one function: block formation, liveness, both
+    # allocators at each register count, verification and RISC-V output.
+    # Returns False if a graph coloring allocation has conflicts. If a results
+    # list is given, one record per allocator run is appended to it. If an
+    # AnalysisCache is given, the CFG analyses are read from and saved to it.
+    # If sweep is a list of register counts, the given allocators are only run
+    # over those counts and a table is printed instead; no code is generated.
+    fname_prefix = filename.split('-')[0] + "_" + func['name']
+    with instrument.profile_function(fname_prefix):
+        return run_pipeline(func, fname_prefix, results, cache, sweep, allocators)
 
-    for func in program['functions']:
+def run_pipeline(func: dict, fname_prefix: str, results, cache, sweep, allocators):
+    instrument.count("functions")
+    entry = cache.lookup(func) if cache is not None else None
+    with instrument.phase("form_blocks"):
         fn_blocks = blocks.form_blocks(func)
         for block in fn_blocks.values():
             block.reinitialize_vars()
-        cfg = CFG(fn_blocks, (func['args'] if 'args' in func else None))
-        cfg.compute_liveness()
+    cfg = CFG(fn_blocks, (func['args'] if 'args' in func else None), entry)
+    analysis = FunctionAnalysis(cfg)
 
-        graph = build_interference_graph(cfg)
-        #print(graph)
-        fname_prefix = filename.split('-')[0] + "_" + func['name']
+    if sweep is not None:
+        rows = sweep_register_counts(cfg, sweep, allocators, analysis=analysis)
+        print_sweep_table(fname_prefix, rows)
+        if results is not None:
+            for row in rows:
+                results.append(dict(row, function=func['name']))
+        if entry is not None:
+            cache.save(entry)
+        return True
 
-        n_regs = 10
-        res, allocated_registers = linear_scan_allocate_registers(cfg, n_regs, fname_prefix)
-        print()
-        regs, spilled_vars = graph_coloring_allocate_registers(cfg, n_regs, fname_prefix)
-        if not verify_register_allocation(cfg, regs, spilled_vars):
-            print("1 REGISTER ALLOCATION HAS CONFLICTS")
-            sys.exit(1)
-        print()
-        n_regs = 7
-        res, allocated_registers = linear_scan_allocate_registers(cfg, n_regs, fname_prefix)
+    for idx, n_regs in enumerate([10, 7, 5]):
+        if idx > 0:
+            print()
+        start_time = time.perf_counter()
+        occupancy, allocated_registers, linear_spills = linear_scan_allocate_registers(cfg, n_regs, fname_prefix, analysis=analysis)
+        linear_time = time.perf_counter() - start_time
         print()
-        regs, spilled_vars = graph_coloring_allocate_registers(cfg, n_regs, fname_prefix)
-        if not verify_register_allocation(cfg, regs, spilled_vars):
-            print("2 REGISTER ALLOCATION HAS CONFLICTS")
-            sys.exit(1)
-        print()
-        n_regs = 5
-        res, allocated_registers = linear_scan_allocate_registers(cfg, n_regs, fname_prefix)
-        print()
-        regs, spilled_vars = graph_coloring_allocate_registers(cfg, n_regs, fname_prefix)
-        if not verify_register_allocation(cfg, regs, spilled_vars):
-            print("3 REGISTER ALLOCATION HAS CONFLICTS")
-            sys.exit(1)
-
-        arg_regs = ['a0', 'a1', 'a2', 'a3', 'a4', 'a5', 'a6', 'a7']
-        ret_regs = ['ra']
-        gp_regs = ['t0', 't1', 't2', 's1', 's2', 's3', 's4', 's5', 's6', 's7', 's8', 's9', 's10', 's11', 't3', 't4', 't5', 't6']
-        special_regs = ['fp', 'sp', 'gp', 'tp', 'zero']
-        specs = RegisterSpecs(arg_regs, ret_regs, gp_regs, special_regs)
+        start_time = time.perf_counter()
+        regs, spilled_vars = graph_coloring_allocate_registers(cfg, n_regs, fname_prefix, analysis)
+        graph_time = time.perf_counter() - start_time
+        if results is not None:
+            results.append({'function': func['name'], 'allocator': 'linear_scan', 'reg_count': n_regs,
+                            'spills': len(linear_spills), 'spill_cost': estimate_spill_cost(analysis.spill_costs, linear_spills),
+                            'registers_used': occupancy.max_pressure(), 'time': linear_time})
+            results.append({'function': func['name'], 'allocator': 'graph_coloring', 'reg_count': n_regs,
+                            'spills': len(spilled_vars), 'spill_cost': estimate_spill_cost(analysis.spill_costs, spilled_vars),
+                            'registers_used': len(set(regs.values()) - {None}), 'time': graph_time,
+                            'moves_eliminated': count_redundant_moves(analysis.moves, regs)})
+        if not verify_register_allocation(cfg, regs, spilled_vars, analysis.graph):
+            print(idx + 1, "REGISTER ALLOCATION HAS CONFLICTS")
+            return False
+
+    if entry is not None:
+        # Save before the instructions are rewritten in terms of registers
+        cache.save(entry)
+
+    arg_regs = ['a0', 'a1', 'a2', 'a3', 'a4', 'a5', 'a6', 'a7']
+    ret_regs = ['ra']
+    gp_regs = ['t0', 't1', 't2', 's1', 's2', 's3', 's4', 's5', 's6', 's7', 's8', 's9', 's10', 's11', 't3', 't4', 't5', 't6']
+    special_regs = ['fp', 'sp', 'gp', 'tp', 'zero']
+    specs = RegisterSpecs(arg_regs, ret_regs, gp_regs, special_regs)
+    with instrument.phase("codegen"):
         cfg = reg_alloc_to_instrs(cfg, regs, specs)
+        eliminated = remove_redundant_moves(cfg)
         cfg.convert_to_riscv_instrs(fname_prefix + ".s")
+    print(fname_prefix, " Eliminated moves: ", eliminated)
 
-        print()
\ No newline at end of file
+    print()
+    return True
+
+def allocate_function_captured(func: dict, filename: str, cache = None, sweep = None, allocators = ALLOCATORS, profile = None):
+    # Worker entry point: the output is captured so the parent can print each
+    # function's report in program order, whichever worker finishes first.
+    # The worker's cache is a copy, so its hit/miss counts are sent back too,
+    # and likewise its profile when the parent is profiling (profile holds the
+    # parent's instrument.options()).
+    output = io.StringIO()
+    results = []
+    if profile is not None:
+        instrument.enable(**profile)
+    with contextlib.redirect_stdout(output):
+        ok = allocate_function(func, filename, results, cache, sweep, allocators)
+    cache_stats = cache.stats() if cache is not None else None
+    profile_report = instrument.disable().report() if profile is not None else None
+    return ok, output.getvalue(), results, cache_stats, profile_report
+
+def allocate_program(program: dict, filename: str, workers = 1, results = None, cache = None, sweep = None, allocators = ALLOCATORS):
+    if workers <= 1:
+        for func in program['functions']:
+            if not allocate_function(func, filename, results, cache, sweep, allocators):
+                return False
+        return True
+    # Functions are independent, so each one goes to its own worker process
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(allocate_function_captured, func, filename, cache, sweep, allocators, instrument.options()) for func in program['functions']]
+        for future in futures:
+            ok, output, func_results, cache_stats, profile_report = future.result()
+            sys.stdout.write(output)
+            if results is not None:
+                results.extend(func_results)
+            if cache is not None:
+                cache.hits += cache_stats['hits']
+                cache.misses += cache_stats['misses']
+            if profile_report is not None:
+                instrument.active.merge(profile_report)
+            if not ok:
+                for pending in futures:
+                    pending.cancel()
+                return False
+    return True
+
+if __name__ == '__main__': 
+    parser = argparse.ArgumentParser(description="Allocate registers for every function in a Bril JSON program")
+    parser.add_argument("filename", nargs="?", help="Bril program, either relabeled .bril text or JSON from bril2json")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="number of worker processes; functions are allocated in parallel when more than 1")
+    parser.add_argument("--sweep", type=parse_reg_counts, metavar="K", help="only report spills, registers used and time at each register count in K, either low:high or a comma separated list")
+    parser.add_argument("--phi-report", action="store_true", help="only report the number of phi nodes and placement time of each SSA phi placement mode")
+    parser.add_argument("--interference-report", action="store_true", help="only compare edge counts, maximum degree, registers needed and build time of the per-block and per-instruction interference builders")
+    parser.add_argument("--loop-report", action="store_true", help="only print the loop-nesting forest of each function, with preheaders, exits and irreducible loops")
+    parser.add_argument("--allocators", default=",".join(ALLOCATORS), help="comma separated allocators to sweep (default: %(default)s)")
+    analysis_cache.add_arguments(parser)
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    cache = analysis_cache.from_arguments(args)
+    profiler = instrument.from_arguments(args)
+    allocators = args.allocators.split(",")
+    for allocator in allocators:
+        if allocator not in ALLOCATORS:
+            parser.error(f"unknown allocator {allocator!r}, choose from {', '.join(ALLOCATORS)}")
+    if args.filename is None:
+        if not args.clear_cache:
+            parser.error("a filename is required unless --clear-cache is given")
+        sys.exit(0)
+
+    with open(args.filename, 'r') as file:
+        if args.filename.endswith(".bril"):
+            # Text input is parsed one function at a time as the driver reaches it
+            program = {'functions': bril_parser.iter_functions(file)}
+        else:
+            program = utils.read_json_file(file)
+        if args.phi_report:
+            report_phi_placement(program, args.filename)
+            sys.exit(0)
+        if args.interference_report:
+            report_interference(program, args.filename)
+            sys.exit(0)
+        if args.loop_report:
+            report_loops(program, args.filename)
+            sys.exit(0)
+        ok = allocate_program(program, args.filename, args.workers, cache=cache, sweep=args.sweep, allocators=allocators)
+
+    if cache is not None:
+        print(cache)
+    if profiler is not None:
+        instrument.disable()
+        print(profiler)
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,175 @@
+import os
+import functools
+import time
+import cProfile
+import argparse
+import contextlib
+import tracemalloc
+
+# Pipeline phases in the order they run, for reports
+PHASES = ["form_blocks", "dominators", "frontiers", "loops", "phi_insertion", "rename", "liveness", "interference",
+          "coalesce", "simplify", "select", "linear_scan", "verify", "codegen"]
+
+class Profiler:
+    """
+    Collects named phase timers and counters for one run. Phases can nest; each
+    records its own inclusive time. With memory tracking on, each phase also
+    records its peak traced memory above what was allocated when it started.
+    """
+    def __init__(self, memory = False, cprofile_dir = None):
+        self.memory = memory
+        self.cprofile_dir = cprofile_dir
+        self.times = dict() # Phase -> total seconds
+        self.calls = dict() # Phase -> number of times entered
+        self.peaks = dict() # Phase -> largest peak in bytes
+        self.counters = dict()
+        self.stack = [] # [start traced bytes, peak seen] of each open phase, innermost last
+        self.started_tracing = False
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+
+    def stop(self):
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        frame = None
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # The peak is reset for this phase, so fold it into the enclosing one first
+            if len(self.stack) > 0:
+                self.stack[-1][1] = max(self.stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            frame = [current, current]
+            self.stack.append(frame)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            self.times[name] = self.times.get(name, 0.0) + elapsed
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if frame is not None:
+                self.stack.pop()
+                frame[1] = max(frame[1], tracemalloc.get_traced_memory()[1])
+                self.peaks[name] = max(self.peaks.get(name, 0), frame[1] - frame[0])
+                if len(self.stack) > 0:
+                    self.stack[-1][1] = max(self.stack[-1][1], frame[1])
+                tracemalloc.reset_peak()
+
+    def count(self, name: str, n = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextlib.contextmanager
+    def profile_function(self, name: str):
+        # cProfile of one function's whole pipeline, dumped as <name>.prof for pstats
+        if self.cprofile_dir is None:
+            yield
+            return
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            os.makedirs(self.cprofile_dir, exist_ok=True)
+            profile.dump_stats(os.path.join(self.cprofile_dir, name.replace(os.sep, "_") + ".prof"))
+
+    def report(self):
+        # Plain data, so it can be sent back from a worker process and merged
+        return {'times': dict(self.times), 'calls': dict(self.calls), 'peaks': dict(self.peaks),
+                'counters': dict(self.counters)}
+
+    def merge(self, report: dict):
+        for name, value in report['times'].items():
+            self.times[name] = self.times.get(name, 0.0) + value
+        for name, value in report['calls'].items():
+            self.calls[name] = self.calls.get(name, 0) + value
+        for name, value in report['peaks'].items():
+            self.peaks[name] = max(self.peaks.get(name, 0), value)
+        for name, value in report['counters'].items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def __str__(self):
+        lines = [f"{'phase':<16}{'calls':>8}{'total (s)':>12}{'mean (ms)':>12}" + (f"{'peak (MB)':>12}" if self.memory else "")]
+        # Known phases first in pipeline order, then anything else that was timed
+        names = [name for name in PHASES if name in self.times] + sorted(name for name in self.times if name not in PHASES)
+        for name in names:
+            line = f"{name:<16}{self.calls[name]:>8}{self.times[name]:>12.4f}{1000 * self.times[name] / self.calls[name]:>12.4f}"
+            if self.memory:
+                line += f"{self.peaks.get(name, 0) / 1e6:>12.2f}"
+            lines.append(line)
+        if len(self.counters) > 0:
+            lines.append("")
+            lines.append(f"{'counter':<28}{'value':>12}")
+            for name in sorted(self.counters):
+                lines.append(f"{name:<28}{self.counters[name]:>12}")
+        return "\n".join(lines)
+
+# The active profiler, None when instrumentation is off. Every hook checks this
+# first, so disabled instrumentation costs one global lookup per call.
+active = None
+NO_PHASE = contextlib.nullcontext()
+
+def enable(memory = False, cprofile_dir = None):
+    global active
+    active = Profiler(memory, cprofile_dir)
+    active.start()
+    return active
+
+def disable():
+    # Returns the profiler that was active, if any
+    global active
+    profiler = active
+    active = None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+def phase(name: str):
+    if active is None:
+        return NO_PHASE
+    return active.phase(name)
+
+def timed(name: str):
+    # Decorator form of phase for functions that are a whole phase on their own
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if active is None:
+                return fn(*args, **kwargs)
+            with active.phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def count(name: str, n = 1):
+    if active is not None:
+        active.count(name, n)
+
+def profile_function(name: str):
+    if active is None:
+        return NO_PHASE
+    return active.profile_function(name)
+
+def options():
+    # Settings of the active profiler, so worker processes can set up their own
+    if active is None:
+        return None
+    return {'memory': active.memory, 'cprofile_dir': active.cprofile_dir}
+
+def add_arguments(parser: argparse.ArgumentParser):
+    # Profiling options shared by cfg.py and batch.py
+    parser.add_argument("--profile", action="store_true", help="print time per pipeline phase and counters at the end")
+    parser.add_argument("--profile-memory", action="store_true", help="with --profile, also track peak memory per phase (slow)")
+    parser.add_argument("--cprofile", metavar="DIR", help="with --profile, dump a cProfile of each function to DIR")
+
+def from_arguments(args):
+    if not args.profile:
+        return None
+    return enable(args.profile_memory, args.cprofile)
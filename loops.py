@@ -0,0 +1,254 @@
+import instrument
+
+# Each enclosing loop is assumed to run its body this many times, the usual static
+# estimate when no profile is available
+LOOP_WEIGHT = 10
+
+class Loop:
+    """
+    One loop of a LoopForest. The header is the loop's first block in depth-first
+    order; a reducible loop can only be entered through it, an irreducible one also
+    has other entries. blocks only holds the blocks directly in this loop, not the
+    ones in loops nested inside it; body() has all of them.
+    """
+    def __init__(self, header: str):
+        self.header = header
+        self.blocks = [header]
+        self.parent = None
+        self.children = []
+        self.depth = 1
+        self.reducible = True
+        self.back_edges = [] # (tail, header) edges that close the loop
+        self.entries = [] # Blocks entered from outside the loop, the header first
+        self.exits = [] # (inside, outside) edges that leave the loop
+        self.preheader = None # The only block entering the header from outside, if it only goes there
+        self.pre = 0 # Preorder and postorder numbers in the forest, for nesting queries
+        self.post = 0
+
+    def __str__(self):
+        kind = "" if self.reducible else " irreducible"
+        return f"Loop(header={self.header}, depth={self.depth}{kind})"
+
+    def __repr__(self):
+        return str(self)
+
+    def encloses(self, other):
+        # True if other is this loop or nested anywhere inside it
+        return self.pre <= other.pre and other.post <= self.post
+
+    def body(self):
+        blocks = []
+        stack = [self]
+        while len(stack) > 0:
+            loop = stack.pop()
+            blocks.extend(loop.blocks)
+            stack.extend(loop.children)
+        return blocks
+
+    def exit_blocks(self):
+        # The blocks outside the loop that it exits to
+        return sorted({outside for _, outside in self.exits})
+
+class UnionFind:
+    # Disjoint sets over 0..n-1 with path compression, so Havlak's algorithm stays
+    # near-linear however deeply loops nest
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, x: int):
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, x: int, into: int):
+        self.parent[x] = into
+
+class LoopForest:
+    """
+    The loop-nesting forest of a CFG, found with Havlak's algorithm ("Nesting of
+    Reducible and Irreducible Loops", 1997), which also finds the irreducible loops
+    that dominance-based back edges miss. Blocks are numbered in depth-first preorder
+    from .start and visited from the last to the first; each block with a back edge
+    into it collects the blocks that reach those back edges into a loop, merging
+    nested loops into it with a union-find. Unreachable blocks are in no loop.
+    """
+    def __init__(self, cfg):
+        with instrument.phase("loops"):
+            self.build(cfg)
+
+    def build(self, cfg):
+        order, last = self.number(cfg)
+        self.number_of = {block_name: idx for idx, block_name in enumerate(order)}
+        n = len(order)
+
+        def is_ancestor(w: int, v: int):
+            return w <= v <= last[w]
+
+        # Predecessors are taken from the successor edges, as for the dominator tree
+        back_preds = [[] for _ in range(n)]
+        non_back_preds = [[] for _ in range(n)]
+        for v, block_name in enumerate(order):
+            for succ in sorted(cfg.blocks[block_name].succs):
+                w = self.number_of[succ]
+                if is_ancestor(w, v):
+                    back_preds[w].append(v)
+                else:
+                    non_back_preds[w].append(v)
+
+        sets = UnionFind(n)
+        loop_of_header = [None] * n
+        innermost = [None] * n # Block number -> innermost loop that directly holds it
+        for w in reversed(range(n)):
+            pool = []
+            in_pool = set()
+            self_loop = False
+            for v in back_preds[w]:
+                if v == w:
+                    self_loop = True
+                    continue
+                x = sets.find(v)
+                if x not in in_pool:
+                    in_pool.add(x)
+                    pool.append(x)
+            reducible = True
+            worklist = list(pool)
+            while len(worklist) > 0:
+                x = worklist.pop()
+                for y in non_back_preds[x]:
+                    y = sets.find(y)
+                    if not is_ancestor(w, y):
+                        # Enters the loop somewhere other than w
+                        reducible = False
+                        non_back_preds[w].append(y)
+                    elif y != w and y not in in_pool:
+                        in_pool.add(y)
+                        pool.append(y)
+                        worklist.append(y)
+            if len(pool) == 0 and not self_loop:
+                continue
+            loop = Loop(order[w])
+            loop.reducible = reducible
+            loop_of_header[w] = loop
+            innermost[w] = loop
+            for x in pool:
+                sets.union(x, w)
+                if loop_of_header[x] is not None:
+                    loop_of_header[x].parent = loop
+                else:
+                    innermost[x] = loop
+                    loop.blocks.append(order[x])
+
+        # Headers in depth-first order, so every parent comes before its children
+        self.loops = [loop for loop in loop_of_header if loop is not None]
+        self.roots = []
+        for loop in self.loops:
+            if loop.parent is None:
+                self.roots.append(loop)
+            else:
+                loop.depth = loop.parent.depth + 1
+                loop.parent.children.append(loop)
+        self.number_loops()
+        self.loop_of = dict() # Block -> innermost loop containing it
+        for x in range(n):
+            if innermost[x] is not None:
+                self.loop_of[order[x]] = innermost[x]
+        self.find_edges(cfg, order)
+
+    def number(self, cfg):
+        # Iterative depth-first preorder from .start, and for each block the number of
+        # the last block in its subtree of the depth-first spanning tree
+        order = [".start"]
+        last = [0]
+        seen = {".start"}
+        stack = [(0, iter(sorted(cfg.blocks[".start"].succs)))]
+        while len(stack) > 0:
+            idx, succs = stack[-1]
+            for succ in succs:
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append((len(order), iter(sorted(cfg.blocks[succ].succs))))
+                    order.append(succ)
+                    last.append(0)
+                    break
+            else:
+                stack.pop()
+                last[idx] = len(order) - 1
+        return order, last
+
+    def number_loops(self):
+        counter = 0
+        stack = [(loop, False) for loop in reversed(self.roots)]
+        while len(stack) > 0:
+            loop, leaving = stack.pop()
+            counter += 1
+            if leaving:
+                loop.post = counter
+                continue
+            loop.pre = counter
+            stack.append((loop, True))
+            stack.extend((child, False) for child in reversed(loop.children))
+
+    def contains(self, loop: Loop, block_name: str):
+        inner = self.loop_of.get(block_name)
+        return inner is not None and loop.encloses(inner)
+
+    def find_edges(self, cfg, order: list):
+        # Every edge leaves the loops around its source that don't hold its target and
+        # enters the loops around its target that don't hold its source, so walking
+        # up from the innermost loops costs one step per loop exited or entered
+        outside_preds = dict() # Loop -> predecessors of its header from outside it
+        for block_name in order:
+            for succ in sorted(cfg.blocks[block_name].succs):
+                loop = self.loop_of.get(block_name)
+                while loop is not None and not self.contains(loop, succ):
+                    loop.exits.append((block_name, succ))
+                    loop = loop.parent
+                loop = self.loop_of.get(succ)
+                while loop is not None and not self.contains(loop, block_name):
+                    if succ not in loop.entries:
+                        loop.entries.append(succ)
+                    if succ == loop.header:
+                        outside_preds.setdefault(loop, []).append(block_name)
+                    loop = loop.parent
+                loop = self.loop_of.get(succ)
+                if loop is not None and loop.header == succ and self.contains(loop, block_name):
+                    loop.back_edges.append((block_name, succ))
+        for loop in self.loops:
+            loop.entries.sort(key=self.number_of.get)
+            preds = outside_preds.get(loop, [])
+            if len(preds) == 1 and cfg.blocks[preds[0]].succs == {loop.header}:
+                loop.preheader = preds[0]
+
+    def depth(self, block_name: str):
+        # Number of loops the block is in, 0 outside of any loop
+        loop = self.loop_of.get(block_name)
+        return 0 if loop is None else loop.depth
+
+    def is_header(self, block_name: str):
+        loop = self.loop_of.get(block_name)
+        return loop is not None and loop.header == block_name
+
+    def __str__(self):
+        lines = []
+        stack = [(loop, 0) for loop in reversed(self.roots)]
+        while len(stack) > 0:
+            loop, indent = stack.pop()
+            line = "  " * indent + f"{loop.header}: depth {loop.depth}, {len(loop.body())} blocks"
+            if not loop.reducible:
+                line += ", irreducible, entries " + " ".join(loop.entries)
+            line += f", preheader {loop.preheader}, exits to " + (" ".join(loop.exit_blocks()) or "nothing")
+            lines.append(line)
+            stack.extend((child, indent + 1) for child in reversed(loop.children))
+        return "\n".join(lines)
+
+def loop_depths(cfg):
+    # Number of loops each block is in, 0 outside of any loop
+    forest = cfg.loops
+    return {block_name: forest.depth(block_name) for block_name in cfg.blocks}
+
+def block_weights(cfg):
+    # Static estimate of how often each block runs relative to the entry
+    return {block_name: LOOP_WEIGHT ** depth for block_name, depth in loop_depths(cfg).items()}
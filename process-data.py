@@ -1,52 +1,53 @@
+import os
+import sys
+import csv
+import json
+import argparse
 import matplotlib.pyplot as plt
 
-def process_output_data(filename):
-    lines = []
+def read_benchmark_results(filename):
+    # Reads the JSON Lines or CSV records written by benchmark.py into per-allocator
+    # dicts keyed by <program>_<function>_<register count>
+    linear_data = dict()
+    graph_data = dict()
     try:
-        with open(filename, 'r') as f:
-            linear_data = dict()
-            graph_data = dict()
-            for line in f:
-                linear_entries = dict()
-                graph_entries = dict()
-                split_line = line.split()
-                if len(split_line) == 0:
-                    continue
-                n_regs = split_line[1]
-                tp = None
-                func_name = split_line[0].split('/')[-1]
-                if 'Graph' in line:
-                    tp = 'Graph'
-                    if 'Time' in line:
-                        graph_entries['time'] = float(line.split()[-1])
-                    line = f.readline()
-                    if 'spills' in line:
-                        graph_entries['spills'] = int(line.split()[-1])
-                    line = f.readline()
-                    if 'registers' in line:
-                        graph_entries['registers'] = int(line.split()[-1])
-                    graph_data[func_name + '_' + n_regs] = graph_entries
-                elif 'Linear' in line:
-                    tp = 'Linear'
-                    if 'Time' in line:
-                        linear_entries['time'] = float(line.split()[-1])
-                    line = f.readline()
-                    if 'spills' in line:
-                        linear_entries['spills'] = int(line.split()[-1])
-                    line = f.readline()
-                    if 'registers' in line:
-                        linear_entries['registers'] = int(line.split()[-1])
-                    linear_data[func_name + '_' + n_regs] = linear_entries
-                else:
-                    continue
-
-        return linear_data, graph_data
+        with open(filename, 'r', newline='') as f:
+            if filename.endswith(".csv"):
+                records = list(csv.DictReader(f))
+            else:
+                records = [json.loads(line) for line in f if line.strip()]
     except FileNotFoundError:
         print(f"Error: File {filename} not found")
         return None
-    except Exception as e:
+    except (json.JSONDecodeError, csv.Error) as e:
         print(f"Error reading file: {e}")
         return None
+    for record in records:
+        program = os.path.basename(record['file']).split('-')[0].split('.')[0]
+        key = program + '_' + record['function'] + '_' + str(record['reg_count'])
+        entries = {'time': int(record['median_ns']) / 1e9,
+                   'spills': int(record['spills']),
+                   'registers': int(record['registers_used'])}
+        if record['allocator'] == 'linear_scan':
+            linear_data[key] = entries
+        elif record['allocator'] == 'graph_coloring':
+            graph_data[key] = entries
+    return linear_data, graph_data
+
+def plot_data(linear_data, graph_data, outfile):
+    # Median time, registers used and spills of both allocators side by side
+    keys = [key for key in linear_data if key in graph_data]
+    xidx = range(len(keys))
+    fig, axes = plt.subplots(3, 1, figsize=(max(8, len(keys) * 0.3), 12), sharex=True)
+    for ax, metric, label in zip(axes, ['time', 'registers', 'spills'], ['Median time (s)', 'Registers used', 'Spills']):
+        ax.bar([x - 0.2 for x in xidx], [linear_data[key][metric] for key in keys], width=0.4, label='Linear Scan')
+        ax.bar([x + 0.2 for x in xidx], [graph_data[key][metric] for key in keys], width=0.4, label='Graph Coloring')
+        ax.set_ylabel(label)
+        ax.legend()
+    axes[-1].set_xticks(list(xidx))
+    axes[-1].set_xticklabels(keys, rotation=90)
+    fig.tight_layout()
+    fig.savefig(outfile)
 
 def compare_data(linear_data, graph_data):
     graph_modded_speed = dict()
@@ -66,34 +67,49 @@ def compare_data(linear_data, graph_data):
     #     plt.plot(xidx, graph_modded_speed[modded_key], 'o', label=modded_key)
     # plt.legend()
     # plt.show()
+    # Only runs both allocators made can be compared, e.g. benchmark.py may have
+    # been run with just one of them
+    keys = [key for key in linear_data if key in graph_data]
+    for key in linear_data:
+        if key not in graph_data:
+            print("Missing graph coloring result for", key)
+    for key in graph_data:
+        if key not in linear_data:
+            print("Missing linear scan result for", key)
+    if len(keys) == 0:
+        print("No results to compare")
+        return
     print("Head to head comparison")
     linear_speedup = dict()
-    for key in linear_modded_speed.keys():
+    for key in keys:
         linear_speedup[key] = graph_modded_speed[key] / linear_modded_speed[key]
         print("Name:", key, "Graph Execution Time: ", graph_modded_speed[key], "Linear Execution Time: ", linear_modded_speed[key], "Speedup: ", linear_speedup[key])
     print("Average speedup of Linear: ", str(sum(linear_speedup.values()) / len(linear_speedup.values())) + "x")
     reg_comparison = dict()
-    for key in linear_regs.keys():
+    for key in keys:
         reg_comparison[key] = graph_regs[key] / linear_regs[key]
         print("Name:", key, "Graph Registers: ", graph_regs[key], "Linear Registers: ", linear_regs[key], "Ratio: ", reg_comparison[key])
     print("Average Registers used by Graph vs Linear: ", str(sum(reg_comparison.values()) / len(reg_comparison.values())) + "x")
     spill_comparison = dict()
-    for key in linear_spills.keys():
+    for key in keys:
         spill_comparison[key] = linear_spills[key] - graph_spills[key]
         print("Name:", key, "Graph Spills: ", graph_spills[key], "Linear Spills: ", linear_spills[key], "Difference: ", spill_comparison[key])
     print("Average Spills used by Linear vs Graph: ", str(sum(spill_comparison.values()) / len(spill_comparison.values())))
 
 def main():
-    import sys
-    
-    if len(sys.argv) != 2:
-        print("Usage: python bril_reader.py <filename>")
+    parser = argparse.ArgumentParser(description="Compare the allocators using results from benchmark.py")
+    parser.add_argument("filename", help="JSON Lines or CSV results from benchmark.py")
+    parser.add_argument("--plot", metavar="FILE", help="also save a plot of time, registers and spills per function")
+    args = parser.parse_args()
+
+    data = read_benchmark_results(args.filename)
+    if data is None:
         sys.exit(1)
-        
-    filename = sys.argv[1]
-    linear_data, graph_data = process_output_data(filename)
+    linear_data, graph_data = data
 
     compare_data(linear_data, graph_data)
+    if args.plot is not None:
+        plot_data(linear_data, graph_data, args.plot)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
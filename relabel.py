@@ -1,122 +1,96 @@
-def read_bril_file(filename):
+import sys
+
+def terminate(line):
+    # bril2json expects every instruction to end with a semicolon
+    if line[-1] != ":" and line[-1] != "}" and line[-1] != "{" and line[-1] != ";":
+        return line + ";"
+    return line
+
+def resolve_function(pending, label_map):
+    # Branch targets are only known once the whole function has been read
+    for item in pending:
+        if isinstance(item, list):
+            yield terminate("  " + " ".join(label_map.get(arg.strip(';'), arg) for arg in item))
+        else:
+            yield item
+
+def relabel_stream(lines):
     """
-    Reads a Bril file line by line and returns the lines
-    
+    Gives every instruction its own label and rewrites branch targets to match
+
     Args:
-        filename: Path to the Bril file to read
-        
+        lines: Any iterable of lines of a Bril file, e.g. an open file
+
     Returns:
-        List of lines from the file
+        Generator of relabeled lines. Only the function currently being read is
+        buffered, since jumps can refer to labels further down in it.
     """
-    lines = []
-    try:
-        with open(filename, 'r') as f:
-            for line in f:
-                # Remove whitespace and comments
-                line = line.strip()
-                if line and not line.startswith('//'):
-                    lines.append(line)
-        return lines
-    except FileNotFoundError:
-        print(f"Error: File {filename} not found")
-        return None
-    except Exception as e:
-        print(f"Error reading file: {e}")
-        return None
-
-def main():
-    import sys
-    
-    if len(sys.argv) != 2:
-        print("Usage: python bril_reader.py <filename>")
-        sys.exit(1)
-        
-    filename = sys.argv[1]
-    lines = read_bril_file(filename)
-    bypassNext = False
-
+    pending = None # Output for the current function, None between functions
+    label_map = dict()
     lctr = 0
-    rename_map = dict()
-    new_lines = []
+    labeled = False # Whether old labels are waiting for the next instruction
     for line in lines:
+        # Remove whitespace and comments
+        line = line.strip()
+        if not line or line.startswith('//'):
+            continue
         if line[0] == "@":
-            new_lines.append(line)
+            if pending is not None:
+                yield from resolve_function(pending, label_map)
+            pending = [line]
+            label_map = dict()
             lctr = 0
+            labeled = False
             continue
-        if line[0] == "#" or line[0] == "}":
-            new_lines.append(line)
-            continue
-        if line.split()[0] == "ret":
-            new_lines.append("  " + line)
-            continue
-        newname = f".l{lctr}"
-        if len(line.split()) == 1:
-            rename_map[line.split()[0].split(":")[0]] = newname
-        else:
-            if line.split()[0].split(":")[0] == "jmp" or line.split()[0].split(":")[0] == "br":
-                new_instr = []
-                for arg in line.split():
-                    #print(rename_map[arg.strip(';')])
-                    if arg.strip(';') in rename_map:
-                        new_instr.append(rename_map[arg.strip(';')])
-                    else:
-                        new_instr.append(arg)
-                new_line = "  " + " ".join(new_instr)
-                new_lines.append(new_line)
+        if pending is None or line[0] == "#":
+            # Comments and anything outside a function are passed through in place
+            if pending is None:
+                yield terminate(line)
             else:
-                new_label = newname + ":"
-                new_lines.append(new_label)
-                new_lines.append("  " + line)
-                lctr += 1
-    new_lines = []
-    lctr = 0
-    written = False
-    for line in lines:
-        if line[0] == "@":
-            new_lines.append(line)
-            lctr = 0
+                pending.append(terminate(line))
             continue
-        if line[0] == "#" or line[0] == "}":
-            new_lines.append(line)
+        if line[0] == "}":
+            pending.append(line)
+            yield from resolve_function(pending, label_map)
+            pending = None
             continue
-        # if line.split()[0] == "ret":
-        #     new_lines.append("  " + line)
-        #     continue
-        newname = f".l{lctr}"
-        if len(line.split()) == 1:
-            rename_map[line.split()[0].split(":")[0]] = newname
-            written = True
+        tokens = line.split()
+        if len(tokens) == 1 and tokens[0][-1] == ":":
+            # An old label now names the next instruction's label
+            label_map[tokens[0][:-1]] = f".l{lctr}"
+            labeled = True
+        elif (tokens[0] == "jmp" or tokens[0] == "br") and not labeled:
+            # Terminators stay in the block of the instruction before them
+            pending.append(tokens)
+        elif tokens[0] == "jmp" or tokens[0] == "br":
+            # unless a label points at the terminator itself, which then needs its own
+            pending.append(f".l{lctr}:")
+            pending.append(tokens)
+            lctr += 1
+            labeled = False
         else:
-            if line.split()[0].split(":")[0] == "jmp" or line.split()[0].split(":")[0] == "br":
-                new_instr = []
-                for arg in line.split():
-                    #print(rename_map[arg.strip(';')])
-                    if arg.strip(';') in rename_map:
-                        new_instr.append(rename_map[arg.strip(';')])
-                    else:
-                        new_instr.append(arg)
-                new_line = "  " + " ".join(new_instr)
-                new_lines.append(new_line)
-            else:
-                new_label = newname + ":"
-                new_lines.append(new_label)
-                new_lines.append("  " + line)
-                lctr += 1
-            written = False
-    # if written:
-    #     new_lines.append(newname + ":")
-        
-    
-    for line in new_lines:
-        if line[-1] != ":" and line[-1] != "}" and line[-1] != "{" and line[-1] != ";":
-            print(line + ";")
-        else:
-            print(line)
+            pending.append(f".l{lctr}:")
+            pending.append(terminate("  " + line))
+            lctr += 1
+            labeled = False
+    if pending is not None:
+        yield from resolve_function(pending, label_map)
 
-    # if lines:
-    #     print("Contents of Bril file:")
-    #     for i, line in enumerate(lines, 1):
-    #         print(f"{i}: {line}")
+def relabel_file(filename, out = sys.stdout):
+    with open(filename, 'r') as f:
+        out.writelines(line + "\n" for line in relabel_stream(f))
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python relabel.py <filename>")
+        sys.exit(1)
+
+    filename = sys.argv[1]
+    try:
+        relabel_file(filename)
+    except FileNotFoundError:
+        print(f"Error: File {filename} not found")
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
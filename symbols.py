@@ -0,0 +1,104 @@
+class SymbolTable:
+    """
+    Interns the variable names of one function. SSA names are written base.version
+    (x.3, and a plain x is version 0 of itself); each distinct name gets a dense
+    integer id the first time it is seen, with its base and version parsed once and
+    kept in flat lists, so later lookups never split strings. The ids are the bit
+    positions of the liveness bitvectors and the vertex ids of the interference
+    graph, and spill costs, live intervals, moves and allocations are keyed by them;
+    names are only looked up again for output.
+    """
+    def __init__(self):
+        self.ids = dict() # Name -> id
+        self.names = [] # Id -> name
+        self.bases = [] # Id -> id of its base name
+        self.versions = [] # Id -> version
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name: str):
+        return name in self.ids
+
+    def add(self, name: str, base: int, version: int):
+        i = len(self.names)
+        self.ids[name] = i
+        self.names.append(name)
+        self.bases.append(i if base is None else base)
+        self.versions.append(version)
+        return i
+
+    def intern(self, name: str):
+        i = self.ids.get(name)
+        if i is not None:
+            return i
+        parts = name.split(".")
+        if len(parts) == 1:
+            return self.add(name, None, 0)
+        # The base is interned first, so it always has the smaller id
+        base = self.intern(parts[0])
+        version = int(parts[-1]) if parts[-1].isdigit() else 0
+        return self.add(name, base, version)
+
+    def versioned(self, base: str, version: int):
+        # The name of a version of base, interned without parsing it back
+        name = base + "." + str(version)
+        if name not in self.ids:
+            self.add(name, self.intern(base), version)
+        return name
+
+    def name(self, i: int):
+        return self.names[i]
+
+    def base(self, i: int):
+        return self.bases[i]
+
+    def version(self, i: int):
+        return self.versions[i]
+
+    def base_of(self, name: str):
+        # Id of the base of a name
+        i = self.ids.get(name)
+        if i is None:
+            i = self.intern(name)
+        return self.bases[i]
+
+    def base_name(self, name: str):
+        i = self.ids.get(name)
+        if i is None:
+            i = self.intern(name)
+        return self.names[self.bases[i]]
+
+    def version_of(self, name: str):
+        return self.versions[self.intern(name)]
+
+    def adopt(self, names: list):
+        # Extends this table to match a numbering saved earlier (see the liveness cache
+        # in cfg.py). Returns False when the saved numbering doesn't agree with the ids
+        # already handed out, in which case data keyed by it can't be reused.
+        if self.names != names[:len(self.names)]:
+            return False
+        for name in names[len(self.names):]:
+            self.intern(name)
+        return self.names[:len(names)] == names
+
+def intern_function(func: dict):
+    """
+    Builds the symbol table of a function, numbering its arguments and then every
+    name in instruction order, so the same function always gets the same ids
+
+    Args:
+        func: Function in the JSON form bril2json produces
+
+    Returns:
+        A SymbolTable holding every variable the function mentions
+    """
+    table = SymbolTable()
+    for arg in func.get('args', []):
+        table.intern(arg['name'])
+    for instr in func['instrs']:
+        if 'dest' in instr:
+            table.intern(instr['dest'])
+        for arg in instr.get('args', []):
+            table.intern(arg)
+    return table
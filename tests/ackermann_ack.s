@@ -1,34 +1,36 @@
 main:
 .l0:
-	li t2, 0
+	li s2, 0
 .l1:
-	li t1, 1
+	li t2, 1
 .l2:
-	beq t2, zero, .l3
-	j l4
+	sub t0, t1, s2
+	beq t0, zero, .l3
+	j l5
 .l3:
-	add t0, t0, t1
+	add t0, s1, t2
+.l5:
+	sub t0, s1, s2
+	beq t0, zero, .l6
+	j l9
 .l4:
 	mv a0, t0
 	jr ra
-.l5:
-	beq t0, zero, .l5
-	j l7
-.l7:
-	call t0, t2, t1
 .l6:
-	sub t2, t0, t1
+	sub t0, t1, t2
+.l9:
+	sub t0, t1, t2
+.l7:
+	call t0, t0, t2
 .l8:
 	mv a0, t0
 	jr ra
-.l9:
-	sub t2, t0, t1
 .l10:
-	sub t1, t0, t1
+	sub t2, s1, t2
 .l11:
-	call t0, t0, t1
+	call t1, t1, t2
 .l12:
-	call t0, t2, t0
+	call t0, t0, t1
 .l13:
 	mv a0, t0
 	jr ra
@@ -1,12 +1,9 @@
 main:
 .l0:
-	mv t0, t0
 .l1:
 	call t0, t0
 .l2:
-	mv t0, t0
 .l3:
-	mv t0, t0
 .l4:
 	print t0
 .l5:
@@ -1,16 +1,12 @@
 main:
 .l0:
-	mv t2, t0
 .l1:
-	mv t1, t0
 .l2:
-	call t1, t2, t1
+	call t2, s1, t2
 .l3:
-	print t1
+	print t2
 .l4:
-	mv t1, t0
 .l5:
-	mv t0, t0
 .l6:
 	call t0, t1, t0
 .l7:
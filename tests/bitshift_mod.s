@@ -1,18 +1,15 @@
 main:
 .l0:
-	mv t0, t1
 .l1:
-	mv t1, t1
+	mv t2, t1
 .l2:
-	mv s1, t2
 .l3:
-	div s1, t1, s1
+	div t2, t2, t0
 .l4:
-	mv t1, t2
 .l5:
-	mul t1, s1, t1
+	mul t0, t2, t0
 .l6:
-	sub t0, t0, t1
+	sub t0, t1, t0
 .l7:
 	mv a0, t0
 	jr ra
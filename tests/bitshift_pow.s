@@ -1,61 +1,50 @@
 main:
 .l0:
-	mv t2, t1
 .l1:
-	li s1, 1
+	li t0, 1
 .l2:
-	beq t2, zero, .l3
-	j l4
+	sub t0, t2, t0
+	beq t0, zero, .l3
+	j l5
 .l3:
-	mv t0, t1
+.l5:
 .l4:
-	mv a0, t0
+	mv a0, t1
 	jr ra
-.l5:
-	mv s2, t1
 .l6:
-	mv t0, t1
 .l7:
-	li s1, 2
+	li t0, 2
 .l8:
-	div t0, t0, s1
+	div t0, t2, t0
 .l9:
-	call s1, s2, t0
+	call t0, t1, t0
 .l10:
-	mv s1, s1
 .l11:
-	mv t0, s1
 .l12:
-	mv s1, s1
+	mv s1, t0
 .l13:
 	mul t0, t0, s1
 .l14:
-	mv t0, t0
 .l15:
-	mv t0, t1
 .l16:
 	li s1, 2
 .l17:
-	call s1, t0, s1
+	call s1, t2, s1
 .l18:
-	li t0, 1
+	li t2, 1
 .l19:
-	beq t0, zero, .l19
-	j l23
-.l23:
-	j .l25
+	sub t2, s1, t2
+	beq t2, zero, .l20
+	j l24
 .l20:
-	mv t0, t0
+.l24:
 .l21:
-	mv t2, t1
 .l22:
-	mul t2, t0, t2
-.l25:
-	mv t0, t1
-.l24:
-	mv t1, t0
+	mul t0, t0, t1
+.l23:
+	j .l26
 .l26:
-	mv t0, t0
+.l25:
 .l27:
 	mv a0, t0
 	jr ra
@@ -1,35 +1,37 @@
 main:
 .l0:
-	li t0, 1
+	li mr, 1
 .l1:
 	li t2, 0
 .l2:
-	beq t1, zero, .l3
-	j l3
+	sub t0, s1, t2
+	beq t0, zero, .l3
+	j l4
 .l3:
-	mv a0, t0
+	mv a0, mr
 	jr ra
 .l4:
-	mv s2, t2
 .l5:
-	mv s1, t2
+	mv t1, t2
 .l6:
-	sub t1, t1, t0
+	sub s1, s1, mr
 .l7:
-	beq t1, zero, .l7
-	j l13
-.l13:
-	j .l7
+	le t0, t1, s1
+	beq t0, zero, .l8
+	j l14
 .l8:
-	sub t2, t1, s1
+	sub s2, s1, t1
+.l14:
+	mv a0, t2
+	jr ra
 .l9:
-	call t1, s1
+	call t0, t1
 .l10:
-	call t2, t2
+	call s2, s2
 .l11:
-	mul t1, t1, t2
+	mul t0, t0, s2
 .l12:
-	add s2, s2, t1
-.l14:
-	mv a0, s2
-	jr ra
+	add t2, t2, t0
+.l13:
+	add t1, t1, mr
+	j .l7
@@ -1,27 +1,32 @@
 main:
 .l0:
-	li t0, 1
+	li t2, 1
 .l1:
-	li t0, 2
+	li t1, 2
 .l2:
+	li t0, 3
 	j .l10
 .l10:
+	print s1
 	j .l3
 .l11:
-	j .l3.l3
+	jr ra
 .l4:
-	div t1, t2, t0
+	div s2, s1, t1
 .l3:
-	beq t0, zero, .l11
+	sub s2, s1, t2
+	beq s2, zero, .l11
 	j l4
 .l5:
-	mul t1, t1, t0
+	mul s2, s2, t1
 .l6:
-	beq t1, zero, .l7
+	sub s2, s1, s2
+	beq s2, zero, .l7
 	j l8
 .l7:
+	div s1, s1, t1
 	j .l10
 .l8:
-	mul t2, t2, t0
+	mul s1, s1, t0
 .l9:
-	add t2, t2, t0
+	add s1, s1, t2
@@ -1,12 +1,12 @@
 main:
 .l0:
-	li t2, 10
+	li t1, 10
 .l1:
-	div t0, t1, t2
+	div t0, t2, t1
 .l2:
-	mul t0, t0, t2
+	mul t0, t0, t1
 .l3:
-	sub t0, t1, t0
+	sub t0, t2, t0
 .l4:
 	mv a0, t0
 	jr ra
@@ -1,22 +1,16 @@
 main:
 .l0:
-	li t0, 23789216
+	li t1, 23789216
 .l1:
-	mv t1, t0
 .l2:
 	li t0, 1748698766
 .l3:
-	mv t0, t0
 .l4:
-	mv t1, t1
 .l5:
-	mv t0, t0
 .l6:
 	call t0, t1, t0
 .l7:
-	mv t0, t0
 .l8:
-	mv t0, t0
 .l9:
 	print t0
 .l10:
@@ -1,27 +1,30 @@
 main:
 .l0:
-	li t0, 0
+	li t2, 0
 .l1:
-	li s1, 1
+	li t1, 1
 .l2:
 	li t0, 2
 .l3:
-	beq t0, zero, .l4
+	lt s2, t1, s1
+	beq s2, zero, .l4
 	j l11
 .l4:
-	div t2, t1, t0
+	div s2, s1, t0
 .l11:
-	div t2, t1, t0t2, t1, t0, t1, t0
 .l5:
-	mul t2, t2, t0
+	mul s2, s2, t0
 .l6:
-	sub t1, t1, t2
+	sub s2, s1, s2
 .l7:
-	beq t1, zero, .l8
+	sub s2, s2, t2
+	beq s2, zero, .l8
 	j l10
 .l8:
 	print t0
 .l10:
+	add t0, t0, t1
 	j .l3
 .l9:
+	div s1, s1, t0
 	j .l3
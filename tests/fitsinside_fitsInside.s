@@ -1,18 +1,18 @@
 main:
 .l0:
-	le s1, t0, t2
+	le t1, mr, s1
 .l1:
-	le t1, t2, t0
+	le t0, s2, t2
 .l2:
-	and t1, s1, t1
+	and t0, t1, t0
 .l3:
-	le t0, t0, t0
+	le t2, mr, t2
 .l4:
-	le t2, t2, t2
+	le t1, s2, s1
 .l5:
-	and t0, t0, t2
+	and t1, t2, t1
 .l6:
-	or t0, t1, t0
+	or t0, t0, t1
 .l7:
 	mv a0, t0
 	jr ra
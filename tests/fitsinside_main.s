@@ -1,5 +1,5 @@
 main:
 .l0:
-	call t0, t0, t0, t0, t0
+	call t0, s1, t2, t1, t0
 .l1:
 	print t0
@@ -1,27 +1,28 @@
 main:
 .l0:
-	mv t2, t2
 .l1:
-	li t0, 10
+	li s2, 10
 .l2:
-	li s1, 0
+	li t2, 0
 .l3:
 	li t1, 1
 .l4:
-	li t0, 2
+	li mr, 2
 .l5:
-	li s2, 1
+	li t0, 1
 .l6:
-	beq t0, zero, .l7
+	lt s2, t2, s1
+	beq s2, zero, .l7
 	j l11
 .l7:
-	mul t0, s1, t0
+	mul s2, t2, mr
 .l11:
 	mv a0, t1
 	jr ra
 .l8:
-	add t0, t0, t1
+	add s2, s2, t1
 .l9:
-	add s1, s1, s2
+	add t2, t2, t0
 .l10:
+	add t1, t2, s2
 	j .l6
@@ -1,18 +1,19 @@
 main:
 .l0:
-	li t0, 0
+	li s2, 0
 .l1:
-	beq t0, zero, .l2
+	gt s2, s1, s2
+	beq s2, zero, .l2
 	j l7
 .l2:
-	li t0, 1
+	li s2, 1
 .l7:
-	li t0, 1t0, 1
+	jr ra
 .l3:
-	sub t0, t1, t0
+	sub s1, s1, s2
 .l4:
-	call t0, t1, t1, t1
+	call s1, t2, t0, t1
 .l5:
-	print t1, t1
+	print t2, t1
 .l6:
-	call t0, t1, t1, t1
+	call s1, t0, t1, t2
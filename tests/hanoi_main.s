@@ -1,9 +1,9 @@
 main:
 .l0:
-	li t0, 0
+	li t2, 0
 .l1:
-	li s1, 2
+	li t1, 2
 .l2:
-	li t1, 1
+	li t0, 1
 .l3:
-	call t2, t0, s1, t1
+	call s1, t2, t1, t0
@@ -1,10 +1,10 @@
 main:
 .l0:
-	div t0, t1, t1
+	div t0, t2, t1
 .l1:
 	mul t0, t0, t1
 .l2:
-	sub t0, t1, t0
+	sub t0, t2, t0
 .l3:
 	mv a0, t0
 	jr ra
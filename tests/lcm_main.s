@@ -1,29 +1,33 @@
 main:
 .l0:
-	mv t1, s1
+	mv t2, s1
 .l1:
-	beq t2, zero, .l2
+	gt t0, mr, s1
+	beq t0, zero, .l2
 	j l3
 .l2:
+	mv t2, mr
 	j .l3
 .l3:
-	call t0, t1, t0
+	call s2, t2, mr
 .l4:
-	call t2, t1, s1
+	call t1, t2, s1
 .l5:
-	li s1, 0
+	li t0, 0
 .l6:
-	sub t0, t0, s1
+	sub s2, s2, t0
 .l7:
-	sub t2, t2, s1
+	sub t0, t1, t0
 .l8:
+	and t0, s2, t0
 	beq t0, zero, .l9
 	j l10
 .l9:
+	print t2
 	j .l12
 .l10:
 	li t0, 1
 .l12:
-	li t0, 1t0, 1
 .l11:
+	add t2, t2, t0
 	j .l3
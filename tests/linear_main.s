@@ -1,32 +1,32 @@
 main:
 .l0:
-	li t1, 10
+	li s1, 10
 .l1:
 	li t2, 1
 .l2:
-	li s1, 1
+	li t0, 1
 .l3:
-	add t0, t1, t2
+	add t1, s1, t2
 .l4:
-	li t1, 50
+	li s1, 50
 .l5:
-	gt t1, t0, s1
+	gt s1, t1, t0
 .l6:
-	mv t0, s1
+	mv t1, t0
 .l7:
-	gt s1, t0, s1
+	gt t0, t1, t0
 .l8:
-	sub t2, t0, s1
+	sub t2, t1, t0
 .l9:
-	mul t1, t0, s1
+	mul s1, t1, t0
 .l10:
-	add s1, s1, t0
+	add t0, t0, t1
 .l11:
-	add t1, s1, s1
+	add s1, t0, t0
 .l12:
-	add t0, s1, t0
+	add t1, t0, t1
 .l13:
-	add t0, t0, t0
+	add t1, t1, t1
 .l14:
-	mv a0, t0
+	mv a0, t1
 	jr ra
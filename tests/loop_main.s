@@ -1,23 +1,25 @@
 main:
 .l0:
-	li t0, 1
+	li s2, 1
 .l1:
-	li t2, 1
+	li mr, 1
 .l2:
 	li s1, 10
 .l3:
-	li t1, 0
+	li t2, 0
 .l4:
-	li t2, 1
+	li t1, 1
 .l5:
+	lt t0, s2, s1
 	beq t0, zero, .l6
 	j l8
 .l6:
-	add t1, t1, t2
+	add t2, t2, t1
 .l8:
-	print t1
+	print t2
 .l7:
+	add s2, s2, mr
 	j .l5
 .l9:
-	mv a0, t1
+	mv a0, t2
 	jr ra
@@ -2,35 +2,41 @@ main:
 .l0:
 	li t2, 10
 .l1:
-	li t0, 1
-.l2:
 	li t1, 1
+.l2:
+	li t0, 1
 .l3:
-	add t0, t2, t0
+	add t1, t2, t1
 .l4:
 	li s2, 50
 .l5:
-	beq s1, zero, .l6
-	j l8
+	gt s1, t1, t0
 .l6:
-	j .l11
-.l8:
-	beq s1, zero, .l9
-	j l10
-.l11:
-	add t0, t1, t0
+	beq s1, zero, .l7
+	j l9
 .l7:
-	add t0, t0, t1
+	mv t1, t0
+	j .l13
 .l9:
-	j .l11
+	gt s1, t1, s2
+.l13:
+	add t1, t0, t1
+.l8:
+	add t1, t1, t0
 .l10:
-	mul t0, t0, t1
+	beq s1, zero, .l11
+	j l12
+.l11:
+	sub t1, t1, t0
+	j .l13
 .l12:
-	add t1, t1, t1
-.l13:
-	add t0, t0, t1
+	mul t1, t1, t0
 .l14:
-	add t0, t0, t2
+	add t0, t0, t0
 .l15:
+	add t0, t1, t0
+.l16:
+	add t0, t0, t2
+.l17:
 	mv a0, t0
 	jr ra
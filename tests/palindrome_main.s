@@ -1,29 +1,34 @@
 main:
 .l0:
-	li t0, 10
+	li mr, 10
 .l1:
-	li t0, 0
+	li s1, 0
 .l2:
-	li s1, 1
+	li t2, 1
 .l3:
-	li t0, 1
+	li t1, 1
 .l4:
-	beq t2, zero, .l5
-	j l10
+	li t0, True
 .l5:
-	call t0, t0, t0
-.l10:
-	sub t0, t0, s1
+	beq t0, zero, .l6
+	j l11
 .l6:
-	div t0, t1, t0
+	call s2, mr, t1
+.l11:
+	sub t0, t1, t2
 .l7:
-	beq t0, zero, .l8
-	j l9
+	div s2, mr, s2
 .l8:
-	j .l5
+	sub s2, s2, s1
+	beq s2, zero, .l9
+	j l10
 .l9:
+	li t0, False
+	j .l5
+.l10:
+	add t1, t1, t2
 	j .l5
-.l11:
-	call t0, t1, t0
 .l12:
+	call t0, mr, t0
+.l13:
 	print t0
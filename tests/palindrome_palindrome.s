@@ -1,44 +1,49 @@
 main:
 .l0:
-	li t1, False
+	li t0, False
 .l1:
-	li t1, 0
+	li t0, 0
 .l2:
-	li t2, 2
+	li mr, 2
 .l3:
-	li t2, 10
+	li s1, 10
 .l4:
+	le t0, mr, t0
 	beq t0, zero, .l5
 	j l6
 .l5:
+	li t0, True
 	j .l19
 .l6:
-	call t0, t2, t0
+	call t2, s1, mr
 .l19:
-	mv a0, t1
+	mv a0, t0
 	jr ra
 .l7:
-	div t1, t2, t0
+	div t1, s2, t2
 .l8:
-	div t0, t2, t2
+	div t0, s2, s1
 .l9:
-	mul t0, t0, t2
+	mul t0, t0, s1
 .l10:
-	sub t0, t2, t0
+	sub t0, s2, t0
 .l11:
-	beq t0, zero, .l12
+	sub mr, t1, t0
+	beq mr, zero, .l12
 	j l18
 .l12:
-	mul t1, t0, t1
+	mul t1, t2, t1
 .l18:
+	li t0, False
 	j .l19
 .l13:
-	sub t1, t2, t1
+	sub t1, s2, t1
 .l14:
 	sub t1, t1, t0
 .l15:
-	div t1, t1, t2
+	div t1, t1, s1
 .l16:
-	sub t0, t0, t2
+	sub t0, mr, mr
 .l17:
+	call t0, t1, t0
 	j .l19
@@ -1,22 +1,27 @@
 main:
 .l0:
-	li t1, 1
+	li s1, 1
 .l1:
-	li t0, 0
+	li mr, 0
 .l2:
-	li t0, 1
+	li t2, 1
 .l3:
-	beq t0, zero, .l4
-	j l8
+	li t1, True
 .l4:
-	beq t0, zero, .l5
-	j l6
-.l8:
-	mv a0, t1
-	jr ra
+	beq t1, zero, .l5
+	j l9
 .l5:
-	j .l4
+	sub t0, s2, mr
+	beq t0, zero, .l6
+	j l7
+.l9:
+	mv a0, s1
+	jr ra
 .l6:
-	mul t1, t1, t0
+	li t1, False
+	j .l4
 .l7:
+	mul s1, s1, mr
+.l8:
+	sub s2, s2, t2
 	j .l4
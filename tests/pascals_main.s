@@ -2,9 +2,7 @@ main:
 .l0:
 	li t0, 5
 .l1:
-	mv t0, t0
 .l2:
-	mv t0, t0
 .l3:
 	call t0
 .l4:
@@ -1,42 +1,44 @@
 main:
 .l0:
-	mv t0, t0
 .l1:
-	li t1, 0
+	li mr, 0
 .l2:
-	li t1, 1
+	li mr, 1
 .l3:
-	li t2, 2
+	li t1, 2
 .l4:
-	mv s2, t1
+	mv t2, mr
 .l5:
-	mv mr, t2
 .l6:
-	mv t1, t1
+	mv mr, mr
 .l7:
-	mul t2, mr, mr
+	mul t0, t1, t1
 .l8:
-	beq t2, zero, .l16
+	gt t0, t0, s1
+	beq t0, zero, .l16
 	j l9
 .l16:
+	sub t0, t2, s1
 	beq t0, zero, .l17
 	j l18
 .l9:
-	div t2, t0, mr
+	div t0, s1, t1
 .l10:
-	mul mr, t2, mr
+	mul s2, t0, t1
 .l11:
-	sub mr, t0, mr
+	sub s2, s1, s2
 .l12:
-	beq s1, zero, .l13
+	sub s2, s2, mr
+	beq s2, zero, .l13
 	j l15
 .l13:
-	add s2, s2, mr
+	add t2, t2, t1
 .l15:
+	add t1, t1, mr
 	j .l7
 .l14:
-	add s2, s2, t2
+	add t2, t2, t0
 .l17:
-	mv t1, t1
+	mv mr, mr
 .l18:
-	print t1
+	print mr
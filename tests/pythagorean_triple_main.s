@@ -1,30 +1,34 @@
 main:
 .l0:
-	li t0, 1
+	li s2, 1
 .l1:
-	mul mr, t2, t2
+	mul mr, mr, mr
 .l2:
-	mv mr, t0
+	mv s1, s2
 .l3:
-	mv s2, t0
+	mv t2, s2
 .l4:
-	mul t1, mr, mr
+	mul t1, s1, s1
 .l5:
-	mul s1, s2, s2
+	mul t0, t2, t2
 .l6:
-	add t1, t1, s1
+	add t0, t1, t0
 .l7:
-	beq t1, zero, .l8
+	sub t0, t0, mr
+	beq t0, zero, .l8
 	j l9
 .l8:
-	print s2, mr
+	print t2, s1
 .l9:
-	add s2, s2, t0
+	add t2, t2, s2
 .l10:
-	beq t1, zero, .l11
+	ge t0, t2, s1
+	beq t0, zero, .l11
 	j l4
 .l11:
-	add mr, mr, t0
+	add s1, s1, s2
 .l12:
-	beq t1, zero, .l13
+	ge t0, s1, mr
+	beq t0, zero, .l13
 	j l3
+.l13:
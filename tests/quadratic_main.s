@@ -1,3 +1,3 @@
 main:
 .l0:
-	call t0, t0, t0
+	call t2, t1, t0
@@ -1,6 +1,6 @@
 main:
 .l0:
-	mul t0, t0, t0
+	mul t0, t1, t0
 .l1:
 	print t0
 .l2:
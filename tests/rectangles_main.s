@@ -1,11 +1,12 @@
 main:
 .l0:
-	call t2, t0, t0
+	call t2, s1, t2
 .l1:
-	call t0, t0, t0
+	call t0, t1, t0
 .l2:
 	sub t1, t2, t0
 .l3:
+	gt t0, t2, t0
 	beq t0, zero, .l6
 	j l4
 .l6:
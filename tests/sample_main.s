@@ -1,36 +1,40 @@
 main:
 .l0:
-	li t1, 10
+	li t2, 10
 .l1:
-	li t0, 1
+	li t1, 1
 .l2:
-	li t2, 1
+	li t0, 1
 .l3:
-	add s1, t1, t0
+	add t1, t2, t1
 .l4:
-	li t0, 50
+	li s2, 50
 .l5:
-	beq t0, zero, .l6
+	gt s1, t1, t0
+	beq s1, zero, .l6
 	j l7
 .l6:
+	mv t1, t0
 	j .l11
 .l7:
-	add s1, s1, t2
+	add t1, t1, t0
 .l11:
-	add s1, t2, s1
+	add t1, t0, t1
 .l8:
-	beq t0, zero, .l9
+	gt s1, t1, s2
+	beq s1, zero, .l9
 	j l10
 .l9:
+	sub t1, t1, t0
 	j .l11
 .l10:
-	mul s1, s1, t2
+	mul t1, t1, t0
 .l12:
-	add t0, t2, t2
+	add t0, t0, t0
 .l13:
-	add t0, s1, t0
+	add t0, t1, t0
 .l14:
-	add t0, t0, t1
+	add t0, t0, t2
 .l15:
 	mv a0, t0
 	jr ra
@@ -1,27 +1,29 @@
 main:
 .l0:
-	li t1, 10
+	li t2, 10
 .l1:
-	li t0, 1
+	li t1, 1
 .l2:
-	li t2, 1
+	li t0, 1
 .l3:
-	add t0, t1, t0
+	add t1, t2, t1
 .l4:
-	li t1, 50
+	li t2, 50
 .l5:
-	gt t0, t0, t2
+	gt t2, t1, t0
 .l6:
-	beq t0, zero, .l7
+	print t2
+	beq t2, zero, .l7
 	j l8
 .l7:
+	mv t1, t0
 	j .l9
 .l8:
-	add t0, t0, t2
+	add t1, t1, t0
 .l9:
-	add t0, t2, t0
+	add t1, t0, t1
 .l10:
-	add t0, t2, t2
+	add t0, t0, t0
 .l11:
 	mv a0, t0
 	jr ra
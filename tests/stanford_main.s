@@ -4,26 +4,28 @@ main:
 .l1:
 	li s2, 1
 .l2:
-	li s1, 2
+	li t1, 2
 .l3:
-	li t1, 3
+	li s1, 3
 .l4:
 	li t0, 4
 .l5:
 	add t0, s2, t0
 .l6:
-	add t1, s1, t1
+	add s1, t1, s1
 .l7:
-	add t1, s1, t1
+	add s1, t1, s1
 .l8:
-	beq t2, zero, .l9
-	j l10
+	sub t1, t0, t2
 .l9:
-	j .l11
+	beq t1, zero, .l10
+	j l11
 .l10:
-	add t0, t0, t1
+	sub t0, t0, s1
+	j .l12
 .l11:
-	mv t0, t0
+	add t0, t0, s1
 .l12:
+.l13:
 	mv a0, t0
 	jr ra
@@ -1,29 +1,20 @@
 main:
 .l0:
-	mv t1, t0
 .l1:
-	call t1, t1
+	call t0, t1
 .l2:
-	mv t1, t1
 .l3:
-	mv t0, t0
 .l4:
-	call t0, t0
+	call t1, t1
 .l5:
-	mv t0, t0
 .l6:
-	mv t2, t0
 .l7:
-	mv t0, t1
 .l8:
-	sub t0, t2, t0
+	sub t0, t1, t0
 .l9:
-	mv t1, t0
 .l10:
-	mv t0, t1
 .l11:
 	print t0
 .l12:
-	li t0, 0
+	li t1, 0
 .l13:
-	mv t0, t1
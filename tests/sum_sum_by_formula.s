@@ -1,12 +1,12 @@
 main:
 .l0:
-	li t2, 1
+	li t0, 1
 .l1:
 	li t1, 2
 .l2:
-	add t2, t2, t0
+	add t0, t0, t2
 .l3:
-	mul t0, t2, t0
+	mul t0, t0, t2
 .l4:
 	div t0, t0, t1
 .l5:
@@ -1,11 +1,12 @@
 main:
 .l0:
-	li t1, 1
+	li s1, 1
 .l1:
 	li t2, 0
 .l2:
 	li t1, 1
 .l3:
+	le t0, t1, s2
 	beq t0, zero, .l4
 	j l6
 .l4:
@@ -14,4 +15,5 @@ main:
 	mv a0, t2
 	jr ra
 .l5:
+	add t1, t1, s1
 	j .l3
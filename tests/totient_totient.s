@@ -1,44 +1,49 @@
 main:
 .l0:
-	mv t0, mr
+	mv t2, s1
 .l1:
 	li t1, 2
 .l2:
-	li t2, 1
+	li mr, 1
 .l3:
-	li s1, 0
+	li t0, 0
 .l4:
-	mul t1, t1, t1
+	mul s2, t1, t1
 .l5:
-	beq t1, zero, .l6
+	le s2, s2, s1
+	beq s2, zero, .l6
 	j l15
 .l6:
-	call s2, mr, t1
+	call s2, s1, t1
 .l15:
-	beq t1, zero, .l16
+	gt t0, s1, mr
+	beq t0, zero, .l16
 	j l18
 .l7:
-	beq s1, zero, .l8
+	sub s2, s2, t0
+	beq s2, zero, .l8
 	j l14
 .l8:
-	call s2, mr, t1
+	call s2, s1, t1
 .l14:
+	add t1, t1, mr
 	j .l4
 .l9:
-	beq s1, zero, .l10
+	sub s2, s2, t0
+	beq s2, zero, .l10
 	j l12
 .l10:
-	div s2, mr, t1
+	div s1, s1, t1
 .l12:
-	div s1, t0, t1
+	div s2, t2, t1
 .l11:
 	j .l8
 .l13:
-	sub t0, t0, s1
+	sub t2, t2, s2
 .l16:
-	div s1, t0, mr
+	div s2, t2, s1
 .l18:
-	mv a0, t0
+	mv a0, t2
 	jr ra
 .l17:
-	sub t0, t0, s1
+	sub t2, t2, s2
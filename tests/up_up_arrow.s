@@ -1,24 +1,28 @@
 main:
 .l0:
-	li t1, 1
+	li t2, 1
 .l1:
-	mv s1, t2
+	mv t1, s1
 .l2:
-	li t1, 1
+	li t0, 1
 .l3:
-	beq t0, zero, .l4
+	lt s2, t0, mr
+	beq s2, zero, .l4
 	j l9
 .l4:
-	beq t0, zero, .l5
+	le s2, mr, t2
+	beq s2, zero, .l5
 	j l6
 .l9:
-	mv a0, s1
+	mv a0, t1
 	jr ra
 .l5:
+	mul t1, t1, s1
 	j .l8
 .l6:
-	sub t0, t0, t1
+	sub s2, mr, t2
 .l8:
+	add t0, t0, t2
 	j .l3
 .l7:
-	call s1, t2, t0, s1
+	call t1, s1, s2, t1
@@ -1,8 +1,5 @@
 import json
 import sys
-import base64
-from IPython.display import Image, display
-import matplotlib.pyplot as plt
 
 def read_json_file(input):
     try:
@@ -34,12 +31,3 @@ def make_cfg_mermaid(blocks: dict):
         for succ in blocks[block_name].succs:
             cfg += f"    {block_name} --> {succ}\n"
     return cfg
-
-def get_base(var: str):
-    return var.split(".")[0]
-
-def get_order(var: str):
-    splits = var.split(".")
-    if len(splits) == 1:
-        return 0
-    return int(splits[-1])
\ No newline at end of file